@@ -0,0 +1,22 @@
+import streamlit as st
+
+# ==============================
+# MULTIPAGE APP
+# ==============================
+# Satu proses Streamlit melayani semua tema dashboard. Setiap halaman hanya
+# lapisan presentasi; data & analitik berasal dari satu mesin bersama
+# (hargapangan.get_engine), sehingga dataset cukup dimuat sekali.
+st.set_page_config(
+    page_title="Dashboard Harga Pangan Nasional",
+    layout="wide",
+    page_icon="🛒"
+)
+
+pages = [
+    st.Page("new.py", title="Dashboard Harga Pangan", icon="🛒", url_path="utama", default=True),
+    st.Page("lagi.py", title="Street Food Edition", icon="🍢", url_path="street-food"),
+    st.Page("testtt.py", title="Market Insight Edition", icon="📊", url_path="market-insight"),
+    st.Page("dashboardHargaPangan.py", title="Versi Sederhana", icon="📄", url_path="sederhana"),
+]
+
+st.navigation(pages).run()
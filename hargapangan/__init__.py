@@ -0,0 +1,33 @@
+"""Modul data bersama untuk Dashboard Harga Pangan Nasional."""
+
+from hargapangan.bundle import open_bundle, write_bundle
+from hargapangan.cube import PriceCube
+from hargapangan.engine import DataEngine, get_demo_engine, get_engine
+from hargapangan.io import load_tables, read_csv_cached
+from hargapangan.leaderboard import Leaderboard
+from hargapangan.regions import REGION_ID, attach_region_id, build_region_dim, has_coordinates
+from hargapangan.schema import apply_schema, basket_presets, commodity_groups, komoditas_columns
+from hargapangan.spatial import RegionIndex, assign_cells, bin_values
+
+__all__ = [
+    "DataEngine",
+    "Leaderboard",
+    "PriceCube",
+    "REGION_ID",
+    "RegionIndex",
+    "apply_schema",
+    "assign_cells",
+    "attach_region_id",
+    "basket_presets",
+    "bin_values",
+    "build_region_dim",
+    "commodity_groups",
+    "get_demo_engine",
+    "get_engine",
+    "has_coordinates",
+    "komoditas_columns",
+    "load_tables",
+    "open_bundle",
+    "read_csv_cached",
+    "write_bundle",
+]
@@ -0,0 +1,165 @@
+"""
+Build offline bundle artefak analitik.
+
+    python -m hargapangan.build [--out data/bundle] [--repeat 5] [--no-bench] [--workers N]
+
+Membaca CSV sekali, membangun kubus harga beserta prefix sum dan agregatnya,
+lalu menulis bundle ber-versi (lihat `hargapangan.bundle`). Setelah itu waktu
+startup dari bundle dibandingkan dengan jalur CSV yang dipakai sebelumnya.
+`--workers N` menjalankan N proses sekaligus dan membandingkan tambahan memori
+per worker untuk kedua jalur (hanya Linux, membaca /proc/self/smaps_rollup).
+"""
+
+import argparse
+import multiprocessing
+import os
+import statistics
+import time
+
+import numpy as np
+
+from hargapangan.bundle import BUNDLE_DIR, open_bundle, write_bundle
+from hargapangan.engine import CLEAN_CSV, GEO_CSV, PROVINCE_CSV, WINS_CSV, DataEngine
+from hargapangan.io import load_tables
+
+
+def _dir_size(path):
+    return sum(
+        os.path.getsize(os.path.join(folder, name))
+        for folder, _, names in os.walk(path)
+        for name in names
+    )
+
+
+def _median_ms(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - start) * 1000)
+    return statistics.median(times)
+
+
+def measure_startup(sources, bundle_dir, repeat=5):
+    """
+    Median waktu (ms) membangun `DataEngine` lewat tiap jalur startup:
+    parsing CSV penuh, CSV dengan cache Parquet, dan bundle (memory-map).
+    """
+    paths = (sources["clean"], sources["wins"], sources["geo"], sources["provinsi"])
+    return {
+        "CSV (parse penuh)": _median_ms(
+            lambda: DataEngine.from_frames(*load_tables(*paths, use_cache=False)), repeat
+        ),
+        "CSV + cache Parquet": _median_ms(
+            lambda: DataEngine.from_frames(*load_tables(*paths)), repeat
+        ),
+        "Bundle (mmap)": _median_ms(
+            lambda: DataEngine.from_bundle(open_bundle(sources, bundle_dir)), repeat
+        ),
+    }
+
+
+def _memory_kb():
+    # Rss: semua halaman yang dipetakan; Private: halaman milik proses ini saja
+    # (halaman page cache yang juga dipetakan worker lain tidak terhitung)
+    fields = {}
+    with open("/proc/self/smaps_rollup", encoding="ascii") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == "kB":
+                fields[parts[0].rstrip(":")] = int(parts[1])
+    return {
+        "rss": fields["Rss"],
+        "private": fields["Private_Clean"] + fields["Private_Dirty"],
+    }
+
+
+def _worker(sources, bundle_dir, use_bundle, barrier, results):
+    before = _memory_kb()
+    paths = (sources["clean"], sources["wins"], sources["geo"], sources["provinsi"])
+    if use_bundle:
+        engine = DataEngine.from_bundle(open_bundle(sources, bundle_dir))
+    else:
+        engine = DataEngine.from_csv(*paths)
+    # Sentuh semua halaman seperti sesi yang sudah membuka ketiga tab
+    for cube in engine.cubes().values():
+        for arr in cube.arrays().values():
+            np.asarray(arr).sum()
+    barrier.wait()
+    after = _memory_kb()
+    results.put({key: after[key] - before[key] for key in after})
+    barrier.wait()
+
+
+def measure_workers(sources, bundle_dir, n_workers):
+    """
+    Median tambahan memori (MB) per worker setelah memuat dataset, dengan
+    `n_workers` proses hidup bersamaan, untuk jalur CSV dan bundle.
+    """
+    ctx = multiprocessing.get_context("spawn")
+    report = {}
+    for label, use_bundle in (("CSV + cache Parquet", False), ("Bundle (mmap)", True)):
+        barrier = ctx.Barrier(n_workers)
+        results = ctx.Queue()
+        procs = [
+            ctx.Process(target=_worker, args=(sources, bundle_dir, use_bundle, barrier, results))
+            for _ in range(n_workers)
+        ]
+        for proc in procs:
+            proc.start()
+        deltas = [results.get() for _ in procs]
+        for proc in procs:
+            proc.join()
+        report[label] = {
+            key: statistics.median(d[key] for d in deltas) / 1024
+            for key in deltas[0]
+        }
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m hargapangan.build",
+        description="Bangun bundle artefak analitik dari CSV harga pangan.",
+    )
+    parser.add_argument("--clean", default=CLEAN_CSV, help="CSV harga hasil imputasi")
+    parser.add_argument("--wins", default=WINS_CSV, help="CSV harga hasil winsorisasi")
+    parser.add_argument("--geo", default=GEO_CSV, help="CSV dengan koordinat Kab/Kota")
+    parser.add_argument("--provinsi", default=PROVINCE_CSV, help="CSV pemetaan Kab/Kota -> Provinsi")
+    parser.add_argument("--out", default=BUNDLE_DIR, help="folder bundle")
+    parser.add_argument("--repeat", type=int, default=5, help="pengulangan tiap pengukuran startup")
+    parser.add_argument("--no-bench", action="store_true", help="lewati pengukuran startup")
+    parser.add_argument("--workers", type=int, default=0, help="ukur memori N worker bersamaan")
+    args = parser.parse_args(argv)
+
+    sources = {"clean": args.clean, "wins": args.wins, "geo": args.geo, "provinsi": args.provinsi}
+
+    start = time.perf_counter()
+    engine = DataEngine.from_csv(args.clean, args.wins, args.geo, args.provinsi)
+    build_path = write_bundle(engine, sources, args.out)
+    elapsed = time.perf_counter() - start
+
+    n_regions, n_periods, n_koms = engine.clean.shape
+    print(f"Bundle ditulis ke {build_path} ({_dir_size(build_path) / 1e6:.2f} MB, {elapsed:.2f} s)")
+    print(f"  {n_regions} Kab/Kota × {n_periods} bulan × {n_koms} komoditas")
+    for level in engine.levels[1:]:
+        print(f"  + kubus agregat {level}: {engine.cube('wins', level).shape[0]} wilayah")
+
+    if not args.no_bench:
+        print(f"Waktu startup data (median dari {args.repeat}x):")
+        timings = measure_startup(sources, args.out, args.repeat)
+        baseline = timings["CSV + cache Parquet"]
+        for label, ms in timings.items():
+            print(f"  {label:<22} {ms:8.1f} ms  ({baseline / ms:5.1f}x vs CSV + cache)")
+
+    if args.workers > 0:
+        if not os.path.exists("/proc/self/smaps_rollup"):
+            print("Pengukuran memori worker hanya tersedia di Linux.")
+            return
+        print(f"Tambahan memori per worker setelah memuat data ({args.workers} worker bersamaan):")
+        for label, mem in measure_workers(sources, args.out, args.workers).items():
+            print(f"  {label:<22} RSS {mem['rss']:6.1f} MB   privat {mem['private']:6.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
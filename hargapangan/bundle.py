@@ -0,0 +1,183 @@
+"""
+Bundle artefak analitik yang dibangun sekali secara offline.
+
+`python -m hargapangan.build` membaca CSV, membangun `DataEngine`, lalu
+menyimpan semua hasil turunannya ke satu folder build ber-versi:
+
+    data/bundle/
+      CURRENT                     nama build aktif (diganti secara atomik)
+      v1-<hash sumber>/
+        manifest.json             versi format, sidik jari CSV, komoditas, kelompok
+        regions.arrow             dimensi wilayah (Arrow IPC tanpa kompresi)
+        clean.values.npy, ...     array kubus (values, mask, prefix sum, agregat)
+        clean-provinsi.values.npy, ...
+                                  kubus agregat per tingkat wilayah (provinsi, pulau)
+
+Saat startup app cukup membuka array `.npy` dengan `mmap_mode="r"` dan tabel
+wilayah lewat `pyarrow.memory_map`; tidak ada parsing CSV maupun perhitungan
+prefix sum/korelasi. Karena semua file dipetakan read-only, beberapa worker
+Streamlit di satu node berbagi halaman page cache yang sama: worker tambahan
+hampir tidak menambah RSS untuk dataset. Bundle dianggap basi jika CSV sumber
+yang masih ada isinya berubah, dan app kembali ke jalur CSV.
+"""
+
+import datetime
+import hashlib
+import os
+import shutil
+
+import numpy as np
+import pyarrow as pa
+from pyarrow import feather
+
+from hargapangan.io import _dump_meta, _read_meta, _write_atomic, file_fingerprint, same_file
+
+BUNDLE_DIR = "data/bundle"
+# Naikkan jika isi/tata letak bundle berubah agar build lama tidak dipakai
+BUNDLE_FORMAT = 5
+CURRENT_FILE = "CURRENT"
+MANIFEST_FILE = "manifest.json"
+REGIONS_FILE = "regions.arrow"
+# Build lama yang disimpan (proses yang masih memetakan build sebelumnya aman)
+KEEP_BUILDS = 2
+
+CUBE_KINDS = ("clean", "wins")
+# Pemisah jenis kubus dan tingkat wilayah pada nama kubus agregat
+LEVEL_SEP = "-"
+
+
+def cube_key(kind, level=None):
+    """Nama kubus di bundle: `kind` untuk Kab/Kota, `kind-level` untuk agregat."""
+    return kind if level is None else f"{kind}{LEVEL_SEP}{level}"
+
+
+def _array_path(build_path, kind, name):
+    return os.path.join(build_path, f"{kind}.{name}.npy")
+
+
+def _write_text(path, text):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+
+
+def _build_id(sources):
+    h = hashlib.sha256(str(BUNDLE_FORMAT).encode())
+    for role in sorted(sources):
+        h.update(f"{role}:{sources[role]['sha256']}".encode())
+    return f"v{BUNDLE_FORMAT}-{h.hexdigest()[:12]}"
+
+
+def _prune(bundle_dir, current_id):
+    # Hapus build lama, sisakan build aktif + build terbaru lainnya (KEEP_BUILDS)
+    builds = [
+        name for name in os.listdir(bundle_dir)
+        if name.startswith("v") and name != current_id and os.path.isdir(os.path.join(bundle_dir, name))
+    ]
+    builds.sort(key=lambda name: os.path.getmtime(os.path.join(bundle_dir, name)), reverse=True)
+    for name in builds[KEEP_BUILDS - 1:]:
+        shutil.rmtree(os.path.join(bundle_dir, name), ignore_errors=True)
+
+
+def write_bundle(engine, source_paths, bundle_dir=BUNDLE_DIR):
+    """
+    Simpan `engine` sebagai build baru di `bundle_dir` lalu jadikan build aktif.
+    `source_paths`: peran -> path CSV ("clean", "wins", "geo"); file yang tidak
+    ada dilewati. Mengembalikan path folder build.
+    """
+    sources = {
+        role: {"path": path, **file_fingerprint(path)}
+        for role, path in source_paths.items()
+        if os.path.exists(path)
+    }
+    build_id = _build_id(sources)
+    build_path = os.path.join(bundle_dir, build_id)
+    tmp_path = f"{build_path}.{os.getpid()}.tmp"
+
+    os.makedirs(bundle_dir, exist_ok=True)
+    shutil.rmtree(tmp_path, ignore_errors=True)
+    os.makedirs(tmp_path)
+
+    arrays = {}
+    for key, cube in engine.cubes().items():
+        # Matriks korelasi yang ditunda (Kendall) dihitung di sini, bukan saat startup
+        for name, arr in cube.precompute().arrays().items():
+            np.save(_array_path(tmp_path, key, name), np.ascontiguousarray(arr))
+            arrays[f"{key}.{name}"] = {"dtype": str(arr.dtype), "shape": list(arr.shape)}
+    feather.write_feather(engine.regions, os.path.join(tmp_path, REGIONS_FILE), compression="uncompressed")
+
+    manifest = {
+        "format": BUNDLE_FORMAT,
+        "build_id": build_id,
+        "created": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "sources": sources,
+        "commodities": list(engine.komoditas_cols),
+        "groups": engine.groups,
+        "arrays": arrays,
+    }
+    _dump_meta(os.path.join(tmp_path, MANIFEST_FILE), manifest)
+
+    # Build dengan sumber yang sama diganti utuh; proses yang masih memetakan
+    # file lama tetap aman karena inode lama baru dilepas setelah di-unmap
+    shutil.rmtree(build_path, ignore_errors=True)
+    os.replace(tmp_path, build_path)
+    _write_atomic(os.path.join(bundle_dir, CURRENT_FILE), lambda p: _write_text(p, build_id))
+    _prune(bundle_dir, build_id)
+    return build_path
+
+
+def current_build(bundle_dir=BUNDLE_DIR):
+    """Path build aktif, atau None jika belum pernah dibangun."""
+    try:
+        with open(os.path.join(bundle_dir, CURRENT_FILE), encoding="utf-8") as f:
+            build_id = f.read().strip()
+    except OSError:
+        return None
+    build_path = os.path.join(bundle_dir, build_id)
+    return build_path if os.path.isdir(build_path) else None
+
+
+def is_fresh(manifest, source_paths):
+    """
+    True jika bundle masih cocok dengan CSV sumber. CSV yang tidak ada di
+    server tidak membuat bundle basi (bundle bisa dideploy tanpa CSV), tetapi
+    CSV baru yang belum tercatat di manifest membuatnya basi.
+    """
+    recorded = manifest.get("sources", {})
+    for role, path in source_paths.items():
+        if not os.path.exists(path):
+            continue
+        if role not in recorded or not same_file(path, recorded[role]):
+            return False
+    return True
+
+
+def open_bundle(source_paths, bundle_dir=BUNDLE_DIR, mmap_mode="r"):
+    """
+    Buka build aktif: dict berisi `manifest`, `regions`, dan array per kubus
+    (`cubes[key][name]` dengan `key` dari `cube_key`, dipetakan dari disk
+    dengan `mmap_mode`).
+    Mengembalikan None jika bundle tidak ada, formatnya lama, atau basi.
+    """
+    build_path = current_build(bundle_dir)
+    if build_path is None:
+        return None
+    manifest = _read_meta(os.path.join(build_path, MANIFEST_FILE))
+    if not manifest or manifest.get("format") != BUNDLE_FORMAT or not is_fresh(manifest, source_paths):
+        return None
+
+    cubes = {}
+    for array_key in manifest["arrays"]:
+        key, name = array_key.split(".", 1)
+        cubes.setdefault(key, {})[name] = np.load(_array_path(build_path, key, name), mmap_mode=mmap_mode)
+    return {
+        "manifest": manifest,
+        "regions": _read_regions(os.path.join(build_path, REGIONS_FILE)),
+        "cubes": cubes,
+    }
+
+
+def _read_regions(path):
+    # Kolom numerik (koordinat) menunjuk langsung ke buffer yang dipetakan;
+    # hanya kamus nama Kab/Kota yang disalin menjadi kategori pandas
+    table = pa.ipc.open_file(pa.memory_map(path)).read_all()
+    return table.to_pandas(split_blocks=True)
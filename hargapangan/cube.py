@@ -0,0 +1,635 @@
+"""
+Kubus harga padat wilayah × bulan × komoditas.
+
+Data panel (505 Kab/Kota × 20 bulan × 20 komoditas) disimpan sebagai satu array
+float32 berbentuk (R, T, K) dengan NaN untuk sel tanpa data. Semua kueri tab
+(rata-rata nasional, rata-rata per wilayah, korelasi) menjadi reduksi vektor di
+atas array ini, bukan group-by DataFrame.
+
+Untuk rata-rata rentang bulan, kubus juga menyimpan jumlah kumulatif dan
+jumlah data kumulatif sepanjang sumbu waktu (prefix sum), sehingga rata-rata
+rentang apa pun cukup dua pengurangan per sel, tidak bergantung panjang rentang.
+
+Matriks korelasi seluruh periode (Pearson dan Spearman) dihitung sekali saat
+kubus dibangun; Kendall (jika scipy terpasang) baru dihitung saat pertama kali
+diminta, kecuali sudah tersimpan di bundle. Pilihan komoditas di Tab 3 cukup
+mengindeks baris & kolom matriks tersebut. Untuk rentang bulan lain,
+Pearson dirakit dari statistik cukup per bulan yang dikumulatifkan (n, Σx,
+Σx², Σxy tiap pasangan) dalam O(k²) tanpa menyentuh data mentah; korelasi
+bergulir semua pasangan adalah selisih statistik tersebut dengan geser satu
+jendela, dihitung dalam satu operasi batch.
+"""
+
+import numpy as np
+import pandas as pd
+
+try:
+    from scipy.stats import kendalltau
+    HAS_SCIPY = True
+except ImportError:  # scipy opsional: tanpa scipy korelasi Kendall tidak tersedia
+    HAS_SCIPY = False
+
+from hargapangan.regions import REGION_ID
+from hargapangan.schema import MONTH_COL, month_number, month_start
+
+
+def _nanmean(values, mask, axis):
+    # nanmean tanpa RuntimeWarning untuk irisan kosong (hasilnya NaN)
+    total = np.where(mask, values, 0).sum(axis=axis, dtype=np.float64)
+    count = mask.sum(axis=axis)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return total / count
+
+
+def pairwise_corr(x, mask=None):
+    """
+    Korelasi Pearson antar kolom `x` (n, k) dengan NaN ditangani pairwise,
+    setara dengan `DataFrame.corr()`.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    if mask is None:
+        mask = ~np.isnan(x)
+    m = mask.astype(np.float64)
+    # Geser ke rata-rata kolom agar jumlah kuadrat tidak kehilangan presisi
+    x = x - _nanmean(x, mask, axis=0)
+    x0 = np.where(mask, x, 0.0)
+
+    return corr_from_stats(m.T @ m, x0.T @ m, (x0 * x0).T @ m, x0.T @ x0)
+
+
+def corr_from_stats(n, sx, sxx, sxy):
+    """
+    Matriks Pearson dari statistik cukup pairwise (..., k, k): untuk pasangan
+    (i, j) atas baris yang lengkap untuk keduanya, `n` jumlah baris, `sx`
+    Σxᵢ, `sxx` Σxᵢ², dan `sxy` Σxᵢxⱼ. Sumbu depan diperlakukan sebagai batch.
+    """
+    sx_t = np.swapaxes(sx, -1, -2)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        cov = sxy - sx * sx_t / n
+        var_i = sxx - sx * sx / n
+        var_j = np.swapaxes(var_i, -1, -2)
+        r = cov / np.sqrt(var_i * var_j)
+    r[n < 2] = np.nan
+    return np.clip(r, -1.0, 1.0)
+
+
+def monthly_pair_stats(values, mask):
+    """
+    Statistik cukup Pearson per bulan, dikumulatifkan sepanjang sumbu waktu:
+    array (4, T + 1, K, K) berisi n, Σx, Σx², Σxy (urutan `corr_from_stats`),
+    indeks t = total bulan [0, t). Harga digeser ke rata-rata seluruh periode
+    tiap komoditas agar selisih jumlah kuadrat tetap presisi; korelasi tidak
+    berubah oleh pergeseran ini.
+    """
+    n_regions, n_periods, n_koms = values.shape
+    shift = _nanmean(values.reshape(-1, n_koms), mask.reshape(-1, n_koms), axis=0)
+    m = mask.astype(np.float64).transpose(1, 0, 2)          # (T, R, K)
+    x0 = np.where(mask, values - shift, 0.0).transpose(1, 0, 2)
+    mT, x0T = m.transpose(0, 2, 1), x0.transpose(0, 2, 1)    # (T, K, R)
+
+    stats = np.zeros((4, n_periods + 1, n_koms, n_koms), dtype=np.float64)
+    np.cumsum(mT @ m, axis=0, out=stats[0, 1:])
+    np.cumsum(x0T @ m, axis=0, out=stats[1, 1:])
+    np.cumsum((x0T * x0T) @ m, axis=0, out=stats[2, 1:])
+    np.cumsum(x0T @ x0, axis=0, out=stats[3, 1:])
+    return stats
+
+
+def rankdata(a):
+    """Peringkat rata-rata untuk nilai kembar (setara `scipy.stats.rankdata`)."""
+    a = np.asarray(a)
+    sorter = np.argsort(a, kind="mergesort")
+    inv = np.empty(sorter.size, dtype=np.intp)
+    inv[sorter] = np.arange(sorter.size)
+    a = a[sorter]
+    obs = np.r_[True, a[1:] != a[:-1]]
+    dense = obs.cumsum()[inv]
+    count = np.r_[np.flatnonzero(obs), obs.size]
+    return 0.5 * (count[dense] + count[dense - 1] + 1)
+
+
+def _pair_rows(x, mask, i, j):
+    rows = mask[:, i] & mask[:, j]
+    return x[rows, i], x[rows, j]
+
+
+def spearman_corr(x, mask=None):
+    """
+    Korelasi Spearman antar kolom `x` (n, k) dengan NaN ditangani pairwise,
+    setara dengan `DataFrame.corr(method="spearman")`: tiap pasangan di-rank
+    ulang pada baris yang lengkap untuk keduanya.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    if mask is None:
+        mask = ~np.isnan(x)
+    k = x.shape[1]
+    r = np.full((k, k), np.nan)
+
+    # Kolom dengan pola data hilang yang sama berbagi baris lengkap: per
+    # pasangan pola cukup rank sekali pada irisan barisnya, lalu korelasikan
+    # semua kolom kedua pola sekaligus
+    # (pola dikelompokkan lewat bytes kolom; np.unique(axis=0) lambat di sini)
+    by_pattern = {}
+    for c in range(k):
+        by_pattern.setdefault(np.packbits(mask[:, c]).tobytes(), []).append(c)
+    members = [np.array(cols) for cols in by_pattern.values()]
+    patterns = [mask[:, cols[0]] for cols in members]
+    for a in range(len(patterns)):
+        for b in range(a, len(patterns)):
+            rows = patterns[a] & patterns[b]
+            cols = np.union1d(members[a], members[b])
+            ranks = np.column_stack([rankdata(x[rows, c]) for c in cols])
+            sub = pairwise_corr(ranks)
+            if a == b:
+                r[np.ix_(cols, cols)] = sub
+            else:
+                ia = np.searchsorted(cols, members[a])
+                ib = np.searchsorted(cols, members[b])
+                r[np.ix_(members[a], members[b])] = sub[np.ix_(ia, ib)]
+                r[np.ix_(members[b], members[a])] = sub[np.ix_(ib, ia)]
+    return r
+
+
+def kendall_corr(x, mask=None):
+    """
+    Korelasi Kendall tau-b antar kolom `x` (n, k), pairwise seperti
+    `DataFrame.corr(method="kendall")`. Membutuhkan scipy.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    if mask is None:
+        mask = ~np.isnan(x)
+    k = x.shape[1]
+    r = np.eye(k)
+    for i in range(k):
+        for j in range(i + 1, k):
+            xi, xj = _pair_rows(x, mask, i, j)
+            r[i, j] = r[j, i] = kendalltau(xi, xj).statistic if xi.size >= 2 else np.nan
+    return r
+
+
+# Batas ukuran spektrum satu kelompok wilayah di `lagged_corr` (byte)
+LAG_BATCH_BYTES = 32 * 1024 * 1024
+
+
+def _fft_length(n):
+    # Panjang FFT cepat (faktor 2, 3, 5) terkecil >= n
+    best = 1 << int(np.ceil(np.log2(n)))
+    p5 = 1
+    while p5 < best:
+        p35 = p5
+        while p35 < best:
+            p235 = p35 << max(0, int(np.ceil(np.log2(n / p35))))
+            best = min(best, p235)
+            p35 *= 3
+        p5 *= 5
+    return best
+
+
+def lagged_corr(values, mask, max_lag, center=None):
+    """
+    Korelasi silang Pearson semua pasangan komoditas untuk lag -`max_lag`
+    sampai `max_lag` atas panel `values` (R, T, K): array (2L + 1, K, K)
+    dengan elemen [l, a, b] = korelasi a(t) dengan b(t + lag), pasangan
+    wilayah-bulan lengkap saja. Lag positif dengan korelasi tinggi berarti a
+    mendahului b. `center` (R, K), jika diberikan, dikurangkan dari tiap
+    wilayah lebih dulu; dengan rata-rata per wilayah hasilnya korelasi
+    dalam-wilayah (perbedaan tingkat harga antar wilayah tidak ikut dihitung).
+
+    Semua jumlah Pearson (n, Σx, Σy, Σx², Σy², Σxy) untuk semua lag berasal
+    dari spektrum silang: FFT sumbu waktu atas [m, x, x²] lalu perkalian
+    matriks per frekuensi yang sekaligus menjumlah atas wilayah. Biaya tumbuh
+    O(T log T) terhadap panjang deret, bukan O(T · L). Spektrum dibangun per
+    kelompok wilayah (`LAG_BATCH_BYTES`) dan hanya hasil perkaliannya yang
+    diakumulasi, sehingga memori puncak tidak tumbuh dengan jumlah wilayah.
+    """
+    n_regions, n_periods, n_koms = values.shape
+    max_lag = min(max_lag, n_periods - 1)
+    if center is None:
+        # Geser ke rata-rata komoditas agar jumlah kuadrat tetap presisi;
+        # korelasi tidak berubah oleh pergeseran seragam ini
+        shift = _nanmean(values.reshape(-1, n_koms), mask.reshape(-1, n_koms), axis=0)
+        center = np.broadcast_to(shift, (n_regions, n_koms))
+
+    # Panjang FFT >= T + L agar korelasi sirkular tidak melipat lag
+    nfft = _fft_length(n_periods + max_lag)
+    n_freq = nfft // 2 + 1
+    lags = np.arange(-max_lag, max_lag + 1)
+    m_, x_, xx_ = (slice(i * n_koms, (i + 1) * n_koms) for i in range(3))
+    batch = max(1, LAG_BATCH_BYTES // (3 * n_koms * max(n_freq, n_periods) * 16))
+
+    # Σ_r U_r · conj(V_r) per frekuensi: [m, x, x²] × m dan x × x
+    with_m = np.zeros((n_freq, 3 * n_koms, n_koms), dtype=np.complex128)
+    with_x = np.zeros((n_freq, n_koms, n_koms), dtype=np.complex128)
+    for lo in range(0, n_regions, batch):
+        hi = min(lo + batch, n_regions)
+        # Sinyal [m, x, x²] dengan waktu di sumbu terakhir (kontigu untuk FFT)
+        mask_t = np.asarray(mask[lo:hi]).transpose(0, 2, 1)
+        signals = np.zeros((hi - lo, 3 * n_koms, n_periods))
+        signals[:, m_] = mask_t
+        np.subtract(
+            np.asarray(values[lo:hi]).transpose(0, 2, 1), center[lo:hi, :, None],
+            out=signals[:, x_], where=mask_t,
+        )
+        np.square(signals[:, x_], out=signals[:, xx_])
+        spec = np.fft.rfft(signals, n=nfft, axis=-1).transpose(2, 1, 0)       # (F, 3K, B)
+        # Konjugasi hanya pada blok kecil sisi kanan
+        with_m += spec @ spec[:, m_].conj().transpose(0, 2, 1)
+        with_x += spec[:, x_] @ spec[:, x_].conj().transpose(0, 2, 1)
+
+    def to_lags(prod):
+        # [lag, a, b] = Σ_r Σ_t u_a[r, t] · v_b[r, t + lag] = irfft(conj(Σ U·conj(V)))
+        return np.fft.irfft(prod.conj(), n=nfft, axis=0)[lags]
+
+    sums = to_lags(with_m)
+    n = np.rint(sums[:, m_])
+    sx, sxx = sums[:, x_], sums[:, xx_]
+    # Jumlah sisi b adalah cermin sisi a: Σ m_a(t) y_b(t + lag) = Σ y_b(t) m_a(t - lag)
+    sy, syy = sx[::-1].transpose(0, 2, 1), sxx[::-1].transpose(0, 2, 1)
+    sxy = to_lags(with_x)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        cov = sxy - sx * sy / n
+        var_x = sxx - sx * sx / n
+        var_y = syy - sy * sy / n
+        r = cov / np.sqrt(var_x * var_y)
+    r[n < 3] = np.nan
+    return np.clip(r, -1.0, 1.0)
+
+
+def top_n_index(values, n=None, highest=True):
+    """
+    Indeks `n` nilai terbesar (`highest`) atau terkecil dari vektor `values`,
+    terurut dari peringkat pertama; NaN diabaikan dan nilai kembar diurutkan
+    menurut indeks. Memakai `argpartition` (O(N + n log n)); tanpa `n`
+    seluruh urutan dikembalikan.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    valid = np.flatnonzero(~np.isnan(values))
+    keys = -values[valid] if highest else values[valid]
+    if n is not None and n < valid.size:
+        part = np.argpartition(keys, n - 1)[:n] if n > 0 else np.empty(0, dtype=np.intp)
+        valid, keys = valid[part], keys[part]
+    return valid[np.lexsort((valid, keys))]
+
+
+# Indeks ketimpangan antar wilayah (lihat `disparity_indices`)
+DISPARITY_INDICES = ("cv", "gini", "max_min", "p90_p10")
+
+
+def _sorted_quantile(x, n, q):
+    # Kuantil interpolasi linear (sama dengan np.nanpercentile) dari `x` yang
+    # sudah terurut naik sepanjang sumbu 0 dengan NaN di ekor; `n` = jumlah
+    # nilai valid per kolom
+    pos = q * np.maximum(n - 1, 0)
+    lo = np.floor(pos).astype(np.intp)
+    hi = np.minimum(lo + 1, np.maximum(n - 1, 0))
+    below = np.take_along_axis(x, lo[None], axis=0)[0]
+    above = np.take_along_axis(x, hi[None], axis=0)[0]
+    return below + (above - below) * (pos - lo)
+
+
+def disparity_indices(values, mask):
+    """
+    Indeks ketimpangan harga antar wilayah untuk setiap (bulan, komoditas)
+    dalam satu reduksi batch sepanjang sumbu R: dict nama -> array (T, K).
+
+    - `cv`: koefisien variasi (simpangan baku populasi / rata-rata)
+    - `gini`: koefisien Gini
+    - `max_min`: rasio harga tertinggi terhadap terendah
+    - `p90_p10`: rasio persentil 90 terhadap persentil 10
+    Sel tanpa data diabaikan; NaN jika kurang dari dua wilayah melapor.
+    """
+    # Satu pengurutan untuk Gini, maks/min, dan kuantil; NaN jatuh ke ekor
+    x = np.sort(np.where(mask, values, np.nan).astype(np.float64), axis=0)
+    n = mask.sum(axis=0)
+    valid = ~np.isnan(x)
+    filled = np.where(valid, x, 0.0)
+    rank = np.arange(1, x.shape[0] + 1, dtype=np.float64)[:, None, None]
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        total = filled.sum(axis=0)
+        mean = total / n
+        var = np.where(valid, (x - mean) ** 2, 0.0).sum(axis=0) / n
+        highest = np.take_along_axis(x, np.maximum(n - 1, 0)[None], axis=0)[0]
+        indices = {
+            "cv": np.sqrt(var) / mean,
+            # Gini dari data terurut: 2·Σ i·x_(i) / (n·Σx) − (n + 1) / n
+            "gini": 2.0 * (rank * filled).sum(axis=0) / (n * total) - (n + 1) / n,
+            "max_min": highest / x[0],
+            "p90_p10": _sorted_quantile(x, n, 0.9) / _sorted_quantile(x, n, 0.1),
+        }
+    for arr in indices.values():
+        arr[n < 2] = np.nan
+    return indices
+
+
+# Metode korelasi -> fungsi pairwise; Kendall hanya jika scipy tersedia
+CORR_FUNCS = {"pearson": pairwise_corr, "spearman": spearman_corr}
+if HAS_SCIPY:
+    CORR_FUNCS["kendall"] = kendall_corr
+
+# Metode yang matriks seluruh periodenya ditunda sampai pertama kali diminta
+# (Kendall: satu panggilan scipy per pasangan, ~0,5 s untuk 190 pasangan)
+LAZY_CORR_METHODS = ("kendall",)
+
+
+class PriceCube:
+    """
+    Kubus harga (R, T, K).
+
+    - `values`: float32, NaN jika wilayah tidak melaporkan harga bulan itu
+    - `mask`: bool, True jika sel berisi data
+    - `periods`: DatetimeIndex awal bulan (sumbu T, terurut, tanpa celah)
+    - `month_index`: indeks bulan sejak Januari 2024 untuk tiap posisi sumbu T
+    - `commodities`: nama komoditas (sumbu K)
+    - `csum`, `ccount`: prefix sum harga dan jumlah data, (R, T + 1, K);
+      indeks t berisi total bulan [0, t)
+    - `monthly_mean`: rata-rata nasional per bulan, (T, K)
+    - `full_corr`: metode -> matriks korelasi seluruh periode, (K, K);
+      metode di `LAZY_CORR_METHODS` baru diisi saat pertama kali diminta
+    - `pair_stats`: statistik cukup Pearson kumulatif, (4, T + 1, K, K);
+      lihat `monthly_pair_stats`
+    `full_corr={}` menandai kubus tanpa agregat korelasi (kubus agregat
+    wilayah & keranjang): `pair_stats` tidak dihitung dan `corr_methods` kosong.
+    Array turunan bisa diberikan langsung (misalnya dari bundle hasil
+    `python -m hargapangan.build`) agar tidak dihitung ulang.
+    Sumbu R mengikuti `region_id` pada dimensi wilayah.
+    """
+
+    def __init__(self, values, periods, commodities, mask=None, csum=None, ccount=None,
+                 monthly_mean=None, full_corr=None, pair_stats=None):
+        self.values = values
+        self.mask = ~np.isnan(values) if mask is None else mask
+        self.periods = pd.DatetimeIndex(periods, name="Periode")
+        self.month_index = np.asarray(month_number(self.periods), dtype=np.int16)
+        self.commodities = list(commodities)
+        self._col = {c: i for i, c in enumerate(self.commodities)}
+
+        n_regions, n_periods, n_koms = values.shape
+        if csum is None or ccount is None:
+            csum = np.zeros((n_regions, n_periods + 1, n_koms), dtype=np.float64)
+            ccount = np.zeros((n_regions, n_periods + 1, n_koms), dtype=np.int32)
+            np.cumsum(np.where(self.mask, values, 0), axis=1, dtype=np.float64, out=csum[:, 1:])
+            np.cumsum(self.mask, axis=1, dtype=np.int32, out=ccount[:, 1:])
+        self.csum = csum
+        self.ccount = ccount
+
+        # Agregat yang tidak bergantung pada pilihan pengguna: rata-rata
+        # nasional tiap bulan dan korelasi seluruh periode
+        if monthly_mean is None:
+            monthly_mean = _nanmean(values, self.mask, axis=0)
+        if full_corr is None:
+            full_corr = {
+                method: self._corr_matrix(method)
+                for method in CORR_FUNCS if method not in LAZY_CORR_METHODS
+            }
+        if pair_stats is None and full_corr:
+            pair_stats = monthly_pair_stats(values, self.mask)
+        self.monthly_mean = monthly_mean
+        self.full_corr = full_corr
+        self.pair_stats = pair_stats
+
+    @classmethod
+    def from_frame(cls, df, commodities, n_regions):
+        """
+        Bangun kubus dari tabel fakta yang sudah memiliki kolom `region_id`.
+        Sumbu bulan dibuat rapat dari bulan pertama sampai terakhir, sehingga
+        posisi sumbu T = `bulan_ke` - bulan pertama. Baris tanpa Kab/Kota yang
+        dikenal (`region_id` -1) dibuang; baris ganda untuk wilayah & bulan
+        yang sama dirata-rata per komoditas (setara group-by mean).
+        """
+        r = df[REGION_ID].to_numpy()
+        keep = r >= 0
+        if MONTH_COL in df.columns:
+            months = df[MONTH_COL].to_numpy()
+        else:
+            months = np.asarray(month_number(df["Periode"].dt))
+        r, months = r[keep], months[keep]
+        first = months.min()
+        periods = month_start(np.arange(first, months.max() + 1))
+        t = months - first
+
+        prices = df[list(commodities)].to_numpy(dtype=np.float64)[keep]
+        reported = ~np.isnan(prices)
+        shape = (n_regions, len(periods), len(commodities))
+        total = np.zeros(shape, dtype=np.float64)
+        count = np.zeros(shape, dtype=np.int32)
+        # add.at menjumlah indeks berulang (fancy assignment biasa menimpanya)
+        np.add.at(total, (r, t), np.where(reported, prices, 0.0))
+        np.add.at(count, (r, t), reported)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            values = (total / count).astype(np.float32)
+        return cls(values, periods, commodities)
+
+    def rollup(self, codes, n_groups):
+        """
+        Kubus agregat (G, T, K) untuk pengelompokan wilayah: `codes` berisi
+        kode grup tiap wilayah (-1 = tanpa grup). Prefix sum grup adalah jumlah
+        prefix sum anggotanya, sehingga rata-rata rentang grup merupakan
+        rata-rata gabungan seluruh laporan Kab/Kota anggota (bukan rata-rata
+        dari rata-rata). Rata-rata nasional per bulan dipakai apa adanya.
+        """
+        codes = np.asarray(codes)
+        member = np.zeros((n_groups, len(codes)))
+        valid = codes >= 0
+        member[codes[valid], np.flatnonzero(valid)] = 1.0
+
+        # Satu perkalian matriks keanggotaan (G, R) untuk seluruh bulan & komoditas
+        csum = np.tensordot(member, self.csum, axes=1)
+        ccount = np.rint(np.tensordot(member, self.ccount, axes=1)).astype(np.int32)
+        total, count = np.diff(csum, axis=1), np.diff(ccount, axis=1)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            values = (total / count).astype(np.float32)
+        # Korelasi tidak pernah dibaca dari kubus agregat
+        return PriceCube(
+            values, self.periods, self.commodities, mask=count > 0,
+            csum=csum, ccount=ccount, monthly_mean=self.monthly_mean, full_corr={},
+        )
+
+    def freeze(self):
+        """Jadikan semua array read-only agar aman dibagi antar sesi."""
+        for arr in self.arrays().values():
+            arr.flags.writeable = False
+        return self
+
+    def arrays(self):
+        """
+        Semua array kubus menurut nama, untuk disimpan ke bundle (matriks
+        korelasi yang ditunda hanya jika sudah dihitung; lihat `precompute`).
+        """
+        arrays = {
+            "values": self.values,
+            "mask": self.mask,
+            "csum": self.csum,
+            "ccount": self.ccount,
+            "monthly_mean": self.monthly_mean,
+            **{f"corr_{method}": r for method, r in self.full_corr.items()},
+            "pair_stats": self.pair_stats,
+            "month_index": self.month_index,
+        }
+        return {name: arr for name, arr in arrays.items() if arr is not None}
+
+    def precompute(self):
+        """Hitung matriks korelasi yang ditunda agar ikut tersimpan di bundle."""
+        for method in self.corr_methods:
+            self.full_corr_matrix(method)
+        return self
+
+    def _corr_matrix(self, method):
+        n_koms = self.shape[2]
+        flat, flat_mask = self.values.reshape(-1, n_koms), self.mask.reshape(-1, n_koms)
+        return CORR_FUNCS[method](flat, flat_mask)
+
+    def full_corr_matrix(self, method):
+        """
+        Matriks korelasi seluruh periode (K, K) untuk `method`; metode yang
+        ditunda dihitung sekali saat pertama kali diminta lalu disimpan.
+        """
+        r = self.full_corr.get(method)
+        if r is None:
+            r = self._corr_matrix(method)
+            r.flags.writeable = False
+            # Dua sesi yang bersamaan paling buruk menghitung dua kali
+            r = self.full_corr.setdefault(method, r)
+        return r
+
+    @property
+    def shape(self):
+        return self.values.shape
+
+    def _idx(self, commodities):
+        return [self._col[c] for c in commodities]
+
+    def _bounds(self, time_range):
+        start, stop, step = time_range.indices(self.shape[1])
+        if step != 1:
+            raise ValueError("Rentang bulan harus kontigu (step 1).")
+        return start, max(start, stop)
+
+    def time_slice(self, start_date, end_date):
+        """
+        Irisan kontigu sumbu bulan untuk rentang tanggal (inklusif). Kedua batas
+        dibulatkan ke bulannya masing-masing lalu dicari dengan `searchsorted`.
+        """
+        start = np.searchsorted(self.month_index, month_number(start_date), side="left")
+        stop = np.searchsorted(self.month_index, month_number(end_date), side="right")
+        return slice(int(start), int(max(start, stop)))
+
+    def national_mean(self, time_range, commodities):
+        """Rata-rata nasional per bulan: DataFrame (bulan × komoditas)."""
+        k = self._idx(commodities)
+        return pd.DataFrame(
+            self.monthly_mean[time_range][:, k],
+            index=self.periods[time_range],
+            columns=list(commodities),
+        )
+
+    def range_mean(self, time_range, commodities=None):
+        """
+        Rata-rata per wilayah sepanjang rentang bulan untuk beberapa komoditas,
+        dari prefix sum: array (R, k), NaN jika wilayah tanpa data di rentang itu.
+        """
+        start, stop = self._bounds(time_range)
+        k = slice(None) if commodities is None else self._idx(commodities)
+        total = self.csum[:, stop, k] - self.csum[:, start, k]
+        count = self.ccount[:, stop, k] - self.ccount[:, start, k]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return total / count
+
+    def region_mean(self, time_range, commodity):
+        """Rata-rata satu komoditas per wilayah sepanjang rentang bulan."""
+        return pd.Series(
+            self.range_mean(time_range, [commodity])[:, 0],
+            index=pd.RangeIndex(self.shape[0], name=REGION_ID),
+            name=commodity,
+        )
+
+    def mom_change(self, time_range):
+        """
+        Perubahan harga (%) bulan terakhir rentang terhadap bulan sebelumnya
+        per wilayah, (R, K); NaN jika salah satu bulan tanpa data atau rentang
+        dimulai di bulan pertama dengan panjang satu bulan.
+        """
+        start, stop = self._bounds(time_range)
+        if stop < 2 or stop == start:
+            return np.full((self.shape[0], self.shape[2]), np.nan)
+        last, prev = self.values[:, stop - 1], self.values[:, stop - 2]
+        valid = self.mask[:, stop - 1] & self.mask[:, stop - 2]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(valid, (last / prev - 1.0) * 100.0, np.nan)
+
+    @property
+    def corr_methods(self):
+        """Metode korelasi yang tersedia (Kendall hanya jika scipy terpasang)."""
+        # Urutan CORR_FUNCS; matriks bundle tanpa fungsinya (scipy hilang) dilewati
+        return list(CORR_FUNCS) if self.full_corr else []
+
+    def corr(self, time_range, commodities, method="pearson"):
+        """
+        Korelasi antar komoditas atas semua pasangan wilayah-bulan di rentang
+        bulan. Seluruh periode diambil dari matriks yang sudah dihitung dan
+        Pearson rentang lain dari selisih `pair_stats` (keduanya O(k²));
+        metode peringkat untuk rentang lain dihitung dari data di rentang itu.
+        """
+        k = self._idx(commodities)
+        start, stop = self._bounds(time_range)
+        if (start, stop) == (0, self.shape[1]):
+            r = self.full_corr_matrix(method)[np.ix_(k, k)]
+        elif method == "pearson":
+            stats = self.pair_stats[:, stop][:, k][:, :, k] - self.pair_stats[:, start][:, k][:, :, k]
+            r = corr_from_stats(*stats)
+        else:
+            v = self.values[:, start:stop][:, :, k].reshape(-1, len(k))
+            m = self.mask[:, start:stop][:, :, k].reshape(-1, len(k))
+            r = CORR_FUNCS[method](v, m)
+        return pd.DataFrame(r, index=list(commodities), columns=list(commodities))
+
+    def rolling_corr(self, window):
+        """
+        Korelasi Pearson bergulir semua pasangan komoditas atas `window` bulan
+        terakhir (semua wilayah): array (T, K, K) sejajar `periods`, dengan
+        baris t memakai bulan [t - window + 1, t]. Bulan sebelum jendela
+        penuh bernilai NaN.
+        """
+        n_periods = self.shape[1]
+        window = min(window, n_periods)
+        r = np.full((n_periods,) + self.pair_stats.shape[2:], np.nan)
+        stats = self.pair_stats[:, window:] - self.pair_stats[:, :-window]
+        r[window - 1:] = corr_from_stats(*stats)
+        return r
+
+    def lead_lag_corr(self, max_lag, per_region=False):
+        """
+        Korelasi silang lag -`max_lag`..`max_lag` semua pasangan komoditas
+        (lihat `lagged_corr`), dari deret rata-rata nasional atau, jika
+        `per_region`, korelasi dalam-wilayah: deret tiap wilayah dikurangi
+        rata-rata wilayah itu sendiri (dari prefix sum) lalu dijumlah atas
+        seluruh wilayah, sehingga yang dibandingkan adalah gerak harga, bukan
+        perbedaan tingkat harga antar wilayah.
+        """
+        if per_region:
+            with np.errstate(invalid="ignore", divide="ignore"):
+                center = self.csum[:, -1] / self.ccount[:, -1]
+            return lagged_corr(self.values, self.mask, max_lag, center=np.nan_to_num(center))
+        national = np.asarray(self.monthly_mean)[None]
+        return lagged_corr(national, ~np.isnan(national), max_lag)
+
+    def disparity(self):
+        """Indeks ketimpangan antar wilayah per bulan (lihat `disparity_indices`)."""
+        return disparity_indices(self.values, self.mask)
+
+    def basket(self, weights, name):
+        """
+        Kubus satu komoditas virtual `name` (R, T, 1): biaya keranjang
+        Σ wₖ · hargaₖ per wilayah dan bulan, satu `tensordot` kubus dengan
+        vektor bobot `weights` (K,). Harga komoditas keranjang yang tidak
+        dilaporkan diisi rata-rata nasional bulan itu; wilayah-bulan tanpa satu
+        pun laporan komoditas keranjang bernilai NaN.
+        """
+        weights = np.asarray(weights, dtype=np.float64)
+        k = np.flatnonzero(weights)
+        filled = np.where(self.mask[..., k], self.values[..., k], np.asarray(self.monthly_mean)[None][..., k])
+        cost = np.tensordot(filled, weights[k], axes=1)
+        reported = self.mask[..., k].any(axis=2) & ~np.isnan(cost)
+        values = np.where(reported, cost, np.nan).astype(np.float32)
+        # Keranjang berkomoditas tunggal: tidak ada pasangan untuk dikorelasikan
+        return PriceCube(values[..., None], self.periods, [name], mask=reported[..., None], full_corr={})
@@ -0,0 +1,466 @@
+"""
+Mesin data bersama untuk seluruh sesi Streamlit.
+
+`get_engine()` memakai `st.cache_resource`, sehingga satu proses hanya memegang
+satu salinan kubus harga dan dimensi wilayah. Semua sesi dan rerun menerima
+objek yang sama (tanpa pickle/copy seperti `st.cache_data`); array di dalamnya
+dibuat read-only. Hasil per tampilan (rata-rata nasional, rata-rata per
+wilayah, sel grid peta, tetangga terdekat, Moran/LISA, indeks ketimpangan,
+korelasi, korelasi bergulir, korelasi silang) di-cache terpisah dengan LRU berukuran terbatas.
+
+Selain kubus per Kab/Kota, mesin memegang kubus agregat per Provinsi dan
+kelompok pulau (`PriceCube.rollup`) yang dihitung sekali saat build, sehingga
+peta dan peringkat bisa berpindah tingkat tanpa agregasi ulang.
+
+Biaya keranjang pangan (`DataEngine.basket`) berupa mesin turunan dengan satu
+komoditas virtual, sehingga semua kueri dan figur di atas berlaku untuknya.
+"""
+
+import functools
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from hargapangan.bundle import BUNDLE_DIR, CUBE_KINDS, LEVEL_SEP, cube_key, open_bundle
+from hargapangan.cube import PriceCube, top_n_index
+from hargapangan.demo import demo_tables
+from hargapangan.io import load_tables
+from hargapangan.leaderboard import Leaderboard
+from hargapangan.regions import BASE_LEVEL, REGION_COL, available_levels, level_codes, level_dim
+from hargapangan.schema import BASKET_COL, commodity_groups, komoditas_columns, month_start
+from hargapangan.spatial import LISA_LABELS, RegionIndex, assign_cells, bin_values, moran, spatial_lag
+
+CLEAN_CSV = "data/data_harga_pangan_wide_imputed.csv"
+WINS_CSV = "data/data_harga_pangan_wide_imputed_winsor.csv"
+GEO_CSV = "data/data_harga_pangan_with_latlon_FINAL.csv"
+PROVINCE_CSV = "data/wilayah_provinsi.csv"
+
+# Jumlah maksimum hasil per tampilan yang disimpan per jenis kueri
+VIEW_CACHE_SIZE = 256
+
+# Autokorelasi spasial: bobot k-NN, jumlah permutasi, dan taraf signifikansi LISA
+MORAN_K = 8
+MORAN_PERMUTATIONS = 999
+MORAN_ALPHA = 0.05
+LISA_CATEGORIES = [LISA_LABELS[code] for code in range(len(LISA_LABELS))]
+
+# Lead-lag: lag hanya dihitung dominan bila deret masih tumpang tindih minimal
+# sebagian ini dari panjang periode (lag ekstrem bertumpu pada sedikit bulan)
+LEAD_LAG_MIN_OVERLAP = 0.75
+
+
+@dataclass(frozen=True, eq=False)
+class DataEngine:
+    """
+    Data read-only yang dibagi semua sesi.
+
+    - `clean`: kubus harga hasil imputasi (tren nasional)
+    - `wins`: kubus harga hasil winsorisasi (perbandingan wilayah & korelasi)
+    - `regions`: dimensi wilayah (index `region_id`)
+    - `komoditas_cols`: nama komoditas sesuai sumbu K kubus
+    - `groups`: kelompok komoditas (nama kelompok -> daftar komoditas)
+    - `rollups`: (jenis, tingkat) -> kubus agregat per Provinsi/Pulau; kosong
+      jika dimensi wilayah tidak memiliki hierarki
+    """
+
+    clean: PriceCube
+    wins: PriceCube
+    regions: pd.DataFrame
+    komoditas_cols: tuple
+    groups: dict
+    rollups: dict = field(default_factory=dict)
+
+    @classmethod
+    def from_frames(cls, clean, wins, regions):
+        komoditas_cols = komoditas_columns(clean)
+        cubes = {
+            "clean": PriceCube.from_frame(clean, komoditas_cols, len(regions)).freeze(),
+            "wins": PriceCube.from_frame(wins, komoditas_cols, len(regions)).freeze(),
+        }
+        rollups = {
+            (kind, level): cubes[kind].rollup(*level_codes(regions, level)).freeze()
+            for level in available_levels(regions) if level != BASE_LEVEL
+            for kind in CUBE_KINDS
+        }
+        return cls(
+            regions=regions,
+            komoditas_cols=tuple(komoditas_cols),
+            groups=commodity_groups(komoditas_cols),
+            rollups=rollups,
+            **cubes,
+        )
+
+    @classmethod
+    def from_csv(cls, clean_path=CLEAN_CSV, wins_path=WINS_CSV, geo_path=GEO_CSV,
+                 province_path=PROVINCE_CSV):
+        return cls.from_frames(*load_tables(clean_path, wins_path, geo_path, province_path))
+
+    @classmethod
+    def from_bundle(cls, bundle):
+        """Bangun dari hasil `open_bundle`: array dipakai apa adanya (memory-map)."""
+        commodities = bundle["manifest"]["commodities"]
+        cubes, rollups = {}, {}
+        for key, arrays in bundle["cubes"].items():
+            arrays = dict(arrays)
+            periods = month_start(arrays.pop("month_index"))
+            full_corr = {
+                name[len("corr_"):]: arrays.pop(name)
+                for name in list(arrays) if name.startswith("corr_")
+            }
+            cube = PriceCube(
+                periods=periods, commodities=commodities, full_corr=full_corr, **arrays
+            ).freeze()
+            kind, _, level = key.partition(LEVEL_SEP)
+            if level:
+                rollups[kind, level] = cube
+            else:
+                cubes[kind] = cube
+        return cls(
+            regions=bundle["regions"],
+            komoditas_cols=tuple(commodities),
+            groups=bundle["manifest"]["groups"],
+            rollups=rollups,
+            **cubes,
+        )
+
+    @classmethod
+    def load(cls, clean_path=CLEAN_CSV, wins_path=WINS_CSV, geo_path=GEO_CSV,
+             province_path=PROVINCE_CSV, bundle_dir=BUNDLE_DIR):
+        """
+        Pakai bundle `python -m hargapangan.build` jika ada dan masih cocok
+        dengan CSV sumber; selain itu bangun dari CSV.
+        """
+        sources = {"clean": clean_path, "wins": wins_path, "geo": geo_path, "provinsi": province_path}
+        bundle = open_bundle(sources, bundle_dir)
+        if bundle is not None:
+            return cls.from_bundle(bundle)
+        return cls.from_csv(clean_path, wins_path, geo_path, province_path)
+
+    def cube(self, kind, level=BASE_LEVEL):
+        """Kubus `kind` untuk tingkat wilayah `level` (sumbu R = kode grup)."""
+        if level != BASE_LEVEL:
+            return self.rollups[kind, level]
+        return self.clean if kind == "clean" else self.wins
+
+    def cubes(self):
+        """Semua kubus menurut nama bundle (lihat `hargapangan.bundle.cube_key`)."""
+        cubes = {kind: self.cube(kind) for kind in CUBE_KINDS}
+        cubes.update({cube_key(kind, level): cube for (kind, level), cube in self.rollups.items()})
+        return cubes
+
+    @property
+    def levels(self):
+        """Tingkat wilayah yang tersedia, dari Kab/Kota ke yang terkasar."""
+        return [BASE_LEVEL, *dict.fromkeys(level for _, level in self.rollups)]
+
+    def basket(self, quantities):
+        """
+        Mesin turunan dengan satu komoditas virtual `BASKET_COL`: biaya
+        keranjang `quantities` (komoditas -> kuantitas) per wilayah dan bulan
+        untuk semua jenis kubus dan tingkat wilayah (lihat `PriceCube.basket`).
+        Hasilnya bisa dipetakan, diperingkat, dan ditampilkan trennya dengan
+        fungsi yang sama seperti komoditas biasa. Keranjang yang sama memakai
+        objek yang sama (cache LRU), sehingga figurnya ikut ter-cache.
+        """
+        key = tuple(sorted((kom, float(qty)) for kom, qty in quantities.items() if qty))
+        return _basket_engine(self, key)
+
+    def level_dim(self, level=BASE_LEVEL):
+        """Dimensi tingkat `level` (lihat `hargapangan.regions.level_dim`)."""
+        return _level_dim(self, level)
+
+    # Hasil di bawah berasal dari cache bersama: perlakukan sebagai read-only
+
+    def national_mean(self, kind, time_range, commodities):
+        return _national_mean(self, kind, time_range.start, time_range.stop, tuple(commodities))
+
+    def region_mean(self, kind, time_range, commodity, level=BASE_LEVEL):
+        return _region_mean(self, kind, time_range.start, time_range.stop, commodity, level)
+
+    def top_regions(self, kind, time_range, commodity, n, highest=True, level=BASE_LEVEL, within=None):
+        """
+        `n` wilayah tingkat `level` dengan rata-rata tertinggi/terendah di
+        rentang bulan: Series (kode wilayah -> rata-rata) terurut dari
+        peringkat pertama. `within=(kolom, nama)` membatasi ke wilayah yang
+        berada di satu induk, mis. `("Provinsi", "Aceh")`. Urutan lengkap per
+        (komoditas, rentang, tingkat, arah) di-cache, sehingga mengubah `n`
+        atau induk hanya menyaring dan mengiris permutasi yang sama. Nilai
+        kembar diurutkan menurut kode wilayah di kedua arah (lihat `top_n_index`).
+        """
+        order = _region_order(self, kind, time_range.start, time_range.stop, commodity, level, highest)
+        if within is not None:
+            col, name = within
+            order = order[(self.level_dim(level)[col] == name).to_numpy()[order]]
+        order = order[:n]
+        mean = self.region_mean(kind, time_range, commodity, level)
+        return mean.iloc[order]
+
+    def spatial_bins(self, kind, time_range, commodity, shape, size):
+        """
+        Rata-rata per wilayah dikelompokkan ke sel grid (`hargapangan.spatial`):
+        DataFrame pusat sel + mean/min/max/count, hanya sel berisi data.
+        """
+        return _spatial_bins(self, kind, time_range.start, time_range.stop, commodity, shape, size)
+
+    def regions_within(self, region_id, radius_km):
+        """Kab/Kota lain dalam radius `radius_km`: DataFrame (Kab/Kota, Jarak (km)) terurut."""
+        ids, km = _region_index(self).within(region_id, radius_km)
+        return self.regions.loc[ids, [REGION_COL]].assign(**{"Jarak (km)": km})
+
+    def nearest_regions(self, kind, time_range, commodity, region_id, k):
+        """
+        `k` Kab/Kota terdekat beserta rata-rata harganya dan selisih terhadap
+        `region_id` (tetangga dikurangi wilayah acuan).
+        """
+        nbr, km = _neighbors(self, k)
+        ids = nbr[region_id]
+        ids, km = ids[ids >= 0], km[region_id][ids >= 0]
+        mean = self.region_mean(kind, time_range, commodity).to_numpy()
+        with np.errstate(invalid="ignore", divide="ignore"):
+            gap = mean[ids] - mean[region_id]
+            gap_pct = gap / mean[region_id] * 100
+        return self.regions.loc[ids, [REGION_COL]].assign(**{
+            "Jarak (km)": km,
+            commodity: mean[ids],
+            "Selisih (Rp)": gap,
+            "Selisih (%)": gap_pct,
+        })
+
+    def spatial_lag(self, kind, time_range, k):
+        """
+        Rata-rata harga `k` tetangga terdekat tiap Kab/Kota untuk semua
+        komoditas sekaligus: DataFrame (region_id × komoditas).
+        """
+        return _spatial_lag(self, kind, time_range.start, time_range.stop, k)
+
+    def spatial_autocorr(self, kind, time_range, commodity, k=MORAN_K):
+        """
+        Moran's I global dan klaster LISA rata-rata harga per Kab/Kota dengan
+        bobot k-NN: (dict global, DataFrame per region_id: I, p, Klaster).
+        """
+        return _spatial_autocorr(self, kind, time_range.start, time_range.stop, commodity, k)
+
+    def disparity(self, kind, time_range, commodities, index, level=BASE_LEVEL):
+        """
+        Indeks ketimpangan `index` (lihat `hargapangan.cube.disparity_indices`)
+        antar wilayah tingkat `level` per bulan: DataFrame (bulan × komoditas).
+        Indeks seluruh bulan dan komoditas dihitung sekali per (jenis, tingkat);
+        rentang dan komoditas lain cukup mengiris hasil yang sama.
+        """
+        values = _disparity(self, kind, level)[index]
+        return pd.DataFrame(
+            values[time_range][:, [self.komoditas_cols.index(kom) for kom in commodities]],
+            index=self.cube(kind, level).periods[time_range],
+            columns=list(commodities),
+        )
+
+    def leaderboard(self, kind, time_range):
+        """Papan peringkat seluruh Kab/Kota (lihat `hargapangan.leaderboard`)."""
+        return _leaderboard(self, kind, time_range.start, time_range.stop)
+
+    def corr(self, kind, time_range, commodities, method="pearson"):
+        return _corr(self, kind, time_range.start, time_range.stop, tuple(commodities), method)
+
+    def rolling_corr(self, kind, window, commodity_a, commodity_b):
+        """Korelasi bergulir sepasang komoditas: Series per bulan akhir jendela."""
+        i, j = self.komoditas_cols.index(commodity_a), self.komoditas_cols.index(commodity_b)
+        return pd.Series(
+            _rolling_corr(self, kind, window)[:, i, j],
+            index=self.cube(kind).periods,
+            name=f"{commodity_a} ~ {commodity_b}",
+        )
+
+    def lead_lag(self, kind, reference, max_lag, per_region=False):
+        """
+        Korelasi silang `reference`(t) dengan tiap komoditas lain (t + lag):
+        DataFrame (komoditas × lag). Puncak di lag positif berarti
+        `reference` mendahului komoditas tersebut.
+        """
+        r = _lead_lag(self, kind, max_lag, per_region)
+        i = self.komoditas_cols.index(reference)
+        others = [j for j, kom in enumerate(self.komoditas_cols) if kom != reference]
+        max_lag = r.shape[0] // 2
+        return pd.DataFrame(
+            r[:, i, others].T,
+            index=[self.komoditas_cols[j] for j in others],
+            columns=pd.RangeIndex(-max_lag, max_lag + 1, name="Lag"),
+        )
+
+    def lag_window(self, kind, max_lag):
+        """
+        Lag mutlak terbesar yang boleh dianggap dominan: deret yang digeser
+        masih tumpang tindih minimal `LEAD_LAG_MIN_OVERLAP` dari panjang periode.
+        """
+        n_periods = len(self.cube(kind).periods)
+        return max(0, min(max_lag, int(n_periods * (1 - LEAD_LAG_MIN_OVERLAP))))
+
+    def dominant_lags(self, kind, commodities, max_lag, per_region=False):
+        """
+        Lag dengan |korelasi| terbesar untuk tiap pasangan komoditas, dicari
+        hanya di dalam `lag_window`: DataFrame (A, B, Lag, Korelasi, Di tepi);
+        Lag > 0 berarti A mendahului B. "Di tepi" menandai lag yang jatuh di
+        batas jendela, sehingga puncak sebenarnya bisa berada di luar jendela.
+        """
+        r = _lead_lag(self, kind, max_lag, per_region)
+        max_lag = r.shape[0] // 2
+        window = self.lag_window(kind, max_lag)
+        r = r[max_lag - window:max_lag + window + 1]
+        idx = [self.komoditas_cols.index(kom) for kom in commodities]
+        a, b = np.triu_indices(len(idx), k=1)
+        a, b = np.asarray(idx)[a], np.asarray(idx)[b]
+        pairs = r[:, a, b]                                   # (2L + 1, pasangan)
+        valid = ~np.isnan(pairs).all(axis=0)
+        best = np.where(np.isnan(pairs), -1.0, np.abs(pairs)).argmax(axis=0)
+        kols = np.asarray(self.komoditas_cols)
+        return pd.DataFrame({
+            "A": kols[a],
+            "B": kols[b],
+            "Lag": best - window,
+            "Korelasi": pairs[best, np.arange(len(best))],
+            "Di tepi": (np.abs(best - window) == window) & (window > 0),
+        })[valid].reset_index(drop=True)
+
+
+@functools.lru_cache(maxsize=VIEW_CACHE_SIZE)
+def _basket_engine(engine, quantities):
+    weights = np.zeros(len(engine.komoditas_cols))
+    for kom, qty in quantities:
+        weights[engine.komoditas_cols.index(kom)] = qty
+    cubes = {kind: engine.cube(kind).basket(weights, BASKET_COL).freeze() for kind in CUBE_KINDS}
+    rollups = {
+        (kind, level): cubes[kind].rollup(*level_codes(engine.regions, level)).freeze()
+        for kind, level in engine.rollups
+    }
+    return DataEngine(
+        regions=engine.regions,
+        komoditas_cols=(BASKET_COL,),
+        groups={BASKET_COL: [BASKET_COL]},
+        rollups=rollups,
+        **cubes,
+    )
+
+
+@functools.lru_cache(maxsize=VIEW_CACHE_SIZE)
+def _national_mean(engine, kind, start, stop, commodities):
+    return engine.cube(kind).national_mean(slice(start, stop), list(commodities))
+
+
+@functools.lru_cache(maxsize=VIEW_CACHE_SIZE)
+def _level_dim(engine, level):
+    return level_dim(engine.regions, level)
+
+
+@functools.lru_cache(maxsize=VIEW_CACHE_SIZE)
+def _region_mean(engine, kind, start, stop, commodity, level):
+    return engine.cube(kind, level).region_mean(slice(start, stop), commodity)
+
+
+@functools.lru_cache(maxsize=VIEW_CACHE_SIZE)
+def _region_order(engine, kind, start, stop, commodity, level, highest):
+    # Permutasi lengkap kode wilayah dari peringkat pertama; top-N untuk n
+    # berapa pun tinggal mengiris kepalanya. Sengaja urut penuh (505 wilayah,
+    # sekali per kunci cache) ketimbang argpartition per n. Arah naik punya
+    # permutasinya sendiri: membalik urutan menurun juga membalik nilai kembar
+    order = top_n_index(
+        engine.region_mean(kind, slice(start, stop), commodity, level).to_numpy(), highest=highest
+    )
+    order.flags.writeable = False
+    return order
+
+
+@functools.lru_cache(maxsize=VIEW_CACHE_SIZE)
+def _grid_cells(engine, shape, size):
+    # Penempatan wilayah ke sel hanya bergantung pada koordinat & resolusi
+    return assign_cells(engine.regions["latitude"], engine.regions["longitude"], shape, size)
+
+
+@functools.lru_cache(maxsize=VIEW_CACHE_SIZE)
+def _spatial_bins(engine, kind, start, stop, commodity, shape, size):
+    cell, centers = _grid_cells(engine, shape, size)
+    return bin_values(cell, centers, engine.region_mean(kind, slice(start, stop), commodity).to_numpy())
+
+
+@functools.lru_cache(maxsize=VIEW_CACHE_SIZE)
+def _region_index(engine):
+    return RegionIndex(engine.regions["latitude"], engine.regions["longitude"])
+
+
+@functools.lru_cache(maxsize=VIEW_CACHE_SIZE)
+def _neighbors(engine, k):
+    # Matriks tetangga (R, k) dipakai ulang semua komoditas, rentang, & tampilan
+    nbr, km = _region_index(engine).neighbors(k)
+    nbr.flags.writeable = False
+    km.flags.writeable = False
+    return nbr, km
+
+
+@functools.lru_cache(maxsize=VIEW_CACHE_SIZE)
+def _spatial_lag(engine, kind, start, stop, k):
+    nbr, _ = _neighbors(engine, k)
+    lag = spatial_lag(engine.cube(kind).range_mean(slice(start, stop)), nbr)
+    return pd.DataFrame(lag, index=engine.regions.index, columns=list(engine.komoditas_cols))
+
+
+@functools.lru_cache(maxsize=VIEW_CACHE_SIZE)
+def _spatial_autocorr(engine, kind, start, stop, commodity, k):
+    # Seed tetap: hasil permutasi stabil antar rerun dan antar sesi
+    nbr, _ = _neighbors(engine, k)
+    mean = engine.region_mean(kind, slice(start, stop), commodity).to_numpy()
+    stats, local = moran(mean, nbr, permutations=MORAN_PERMUTATIONS, seed=0)
+    cluster = np.where(local["p"] < MORAN_ALPHA, local["quadrant"], 0)
+    frame = pd.DataFrame(
+        {"I": local["I"], "p": local["p"], "Klaster": pd.Categorical.from_codes(cluster, LISA_CATEGORIES)},
+        index=engine.regions.index,
+    )
+    return stats, frame
+
+
+@functools.lru_cache(maxsize=VIEW_CACHE_SIZE)
+def _disparity(engine, kind, level):
+    indices = engine.cube(kind, level).disparity()
+    for arr in indices.values():
+        arr.flags.writeable = False
+    return indices
+
+
+@functools.lru_cache(maxsize=VIEW_CACHE_SIZE)
+def _leaderboard(engine, kind, start, stop):
+    return Leaderboard.from_cube(engine.cube(kind), engine.regions[REGION_COL], slice(start, stop))
+
+
+@functools.lru_cache(maxsize=VIEW_CACHE_SIZE)
+def _corr(engine, kind, start, stop, commodities, method):
+    return engine.cube(kind).corr(slice(start, stop), list(commodities), method)
+
+
+@functools.lru_cache(maxsize=VIEW_CACHE_SIZE)
+def _rolling_corr(engine, kind, window):
+    # Semua pasangan sekaligus: pasangan lain dengan jendela sama tinggal diindeks
+    r = engine.cube(kind).rolling_corr(window)
+    r.flags.writeable = False
+    return r
+
+
+@functools.lru_cache(maxsize=VIEW_CACHE_SIZE)
+def _lead_lag(engine, kind, max_lag, per_region):
+    # Semua pasangan dan lag sekaligus; ganti komoditas acuan cukup mengindeks
+    r = engine.cube(kind).lead_lag_corr(max_lag, per_region)
+    r.flags.writeable = False
+    return r
+
+
+@st.cache_resource(show_spinner="Memuat data harga pangan...")
+def get_engine():
+    """
+    Mesin data tunggal per proses. Membuka bundle hasil build offline jika
+    tersedia; melempar FileNotFoundError jika bundle maupun CSV tidak ada.
+    """
+    return DataEngine.load()
+
+
+@st.cache_resource
+def get_demo_engine():
+    """Mesin data simulasi untuk mode demo, dibuat sekali per proses."""
+    return DataEngine.from_frames(*demo_tables())
@@ -0,0 +1,524 @@
+"""
+Lapisan figur Plotly dengan memo bersama.
+
+Setiap grafik dashboard dibangun dari parameter yang dinormalisasi (rentang
+bulan sebagai (start, stop), daftar komoditas sebagai tuple, top-N, dan
+`ChartStyle` tema). Figur hasil build disimpan di cache LRU per proses yang
+dibatasi jumlah entri dan perkiraan total ukuran datanya, sehingga rerun,
+sesi lain, maupun tema lain dengan gaya yang sama tidak membangun ulang lewat
+`plotly.express` (validasi + merge template).
+
+Data trace dipadatkan sesuai presisi yang ditampilkan: harga dibulatkan ke
+rupiah dan dikirim sebagai float32, korelasi dibulatkan dua desimal, tanggal
+ditulis "YYYY-MM", dan kolom hover yang sudah ada di trace tidak diulang.
+Plotly >= 6 mengirim array numpy sebagai typed array biner (base64), sehingga
+float32 langsung memangkas separuh ukuran array tersebut.
+
+Figur dari cache dipakai bersama: perlakukan sebagai read-only.
+"""
+
+import functools
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+
+import numpy as np
+import plotly.express as px
+import plotly.graph_objects as go
+
+from hargapangan.regions import BASE_LEVEL, LEVELS
+
+# Judul sumbu tiap indeks ketimpangan (lihat `hargapangan.cube.DISPARITY_INDICES`)
+DISPARITY_TITLES = {
+    "cv": "Koefisien variasi",
+    "gini": "Koefisien Gini",
+    "max_min": "Rasio tertinggi / terendah",
+    "p90_p10": "Rasio P90 / P10",
+}
+
+# Warna klaster LISA (merah = hotspot mahal, biru = coldspot murah)
+LISA_COLORS = {
+    "Tinggi-Tinggi": "#d7191c",
+    "Rendah-Rendah": "#2c7bb6",
+    "Tinggi-Rendah": "#fdae61",
+    "Rendah-Tinggi": "#abd9e9",
+    "Tidak signifikan": "#d1d5db",
+}
+
+# Batas cache figur per proses (mana yang tercapai lebih dulu)
+FIGURE_CACHE_ENTRIES = 256
+FIGURE_CACHE_BYTES = 64 * 1024 * 1024
+# Perkiraan ukuran layout + template per figur (di luar data trace)
+FIGURE_OVERHEAD_BYTES = 10 * 1024
+
+
+@dataclass(frozen=True)
+class ChartStyle:
+    """
+    Gaya grafik satu tema; seluruh field hashable karena ikut menjadi kunci cache.
+
+    - `transparent`: latar grafik transparan + warna font `font_color`
+    - `corr_text_format`: `text_auto` heatmap korelasi (True atau format d3)
+    """
+
+    transparent: bool = True
+    font_color: str = "#111827"
+    trend_height: int = 460
+    map_height: int = 480
+    map_colorscale: str = "YlOrRd"
+    bar_high_color: str = "#d73027"
+    bar_low_color: str = "#fee08b"
+    corr_height: int = 650
+    corr_text_format: object = True
+    rolling_height: int = 420
+    disparity_height: int = 420
+    lead_lag_height: int = 560
+
+
+class FigureCache:
+    """
+    LRU figur dengan batas jumlah entri dan total ukuran. Ukuran diperkirakan
+    dari isi trace (byte array numpy + teks) ditambah `FIGURE_OVERHEAD_BYTES`,
+    tanpa serialisasi JSON yang toh dilakukan lagi oleh Streamlit saat kirim.
+    """
+
+    def __init__(self, max_entries=FIGURE_CACHE_ENTRIES, max_bytes=FIGURE_CACHE_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._items = OrderedDict()
+        # Sesi Streamlit berjalan di thread berbeda dalam satu proses
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._items)
+
+    def get(self, key):
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return item[0]
+
+    def put(self, key, fig):
+        size = FIGURE_OVERHEAD_BYTES + sum(_payload_bytes(trace.to_plotly_json()) for trace in fig.data)
+        with self._lock:
+            if key in self._items:
+                self.nbytes -= self._items.pop(key)[1]
+            self._items[key] = (fig, size)
+            self.nbytes += size
+            while self._items and (len(self._items) > self.max_entries or self.nbytes > self.max_bytes):
+                _, (_, evicted) = self._items.popitem(last=False)
+                self.nbytes -= evicted
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+            self.nbytes = 0
+
+
+def _payload_bytes(obj):
+    # Perkiraan ukuran isi trace: array numpy per byte, teks per karakter
+    if isinstance(obj, np.ndarray):
+        return obj.nbytes
+    if isinstance(obj, dict):
+        return sum(len(key) + _payload_bytes(value) for key, value in obj.items())
+    if isinstance(obj, (list, tuple)):
+        return sum(_payload_bytes(value) for value in obj)
+    if isinstance(obj, str):
+        return len(obj)
+    return 8
+
+
+figure_cache = FigureCache()
+
+
+def _memo(builder):
+    @functools.wraps(builder)
+    def wrapper(*args):
+        key = (builder.__name__, *args)
+        fig = figure_cache.get(key)
+        if fig is None:
+            fig = builder(*args)
+            # Hasil kosong (None) murah dibangun ulang, tidak disimpan
+            if fig is not None:
+                figure_cache.put(key, fig)
+        return fig
+    return wrapper
+
+
+def _rupiah(values):
+    # Harga tampil sebagai rupiah bulat; float32 tepat untuk bilangan bulat < 2^24
+    return np.round(np.asarray(values, dtype=np.float64)).astype(np.float32)
+
+
+def _style(fig, style, plot_bg=True):
+    if style.transparent:
+        fig.update_layout(
+            paper_bgcolor="rgba(0,0,0,0)",
+            font=dict(color=style.font_color, size=11)
+        )
+        if plot_bg:
+            fig.update_layout(plot_bgcolor="rgba(0,0,0,0)")
+    return fig
+
+
+# ==============================
+# API (parameter dinormalisasi di sini)
+# ==============================
+def trend_figure(engine, time_range, commodities, style):
+    """Garis rata-rata nasional per bulan untuk komoditas terpilih."""
+    return _trend_figure(engine, time_range.start, time_range.stop, tuple(commodities), style)
+
+
+def map_figure(engine, time_range, commodity, style, grid=None, level=BASE_LEVEL, within=None):
+    """
+    Peta sebaran rata-rata harga; None jika tidak ada titik valid. Tanpa
+    `grid` satu titik per wilayah tingkat `level` (di titik tengah anggota
+    untuk Provinsi/Pulau), dibatasi ke satu induk jika `within=(kolom, nama)`.
+    Dengan `grid=(bentuk, ukuran)` satu penanda per sel grid Kab/Kota (lihat
+    `hargapangan.spatial`).
+    """
+    if grid is None:
+        return _map_figure(engine, time_range.start, time_range.stop, commodity, style, level, within)
+    return _grid_map_figure(engine, time_range.start, time_range.stop, commodity, *grid, style)
+
+
+def lisa_map_figure(engine, time_range, commodity, style):
+    """Peta klaster LISA (hotspot/coldspot & outlier) per Kab/Kota; None jika kosong."""
+    return _lisa_map_figure(engine, time_range.start, time_range.stop, commodity, style)
+
+
+def rank_figure(engine, time_range, commodity, n, highest, style, level=BASE_LEVEL, within=None):
+    """
+    Bar chart `n` wilayah tingkat `level` termahal (`highest`) atau termurah,
+    opsional dibatasi ke satu induk `within=(kolom, nama)`.
+    """
+    return _rank_figure(
+        engine, time_range.start, time_range.stop, commodity, n, highest, style, level, within
+    )
+
+
+def corr_figure(engine, time_range, commodities, style, method="pearson"):
+    """Heatmap korelasi antar komoditas (`method`: lihat `PriceCube.corr_methods`)."""
+    return _corr_figure(engine, time_range.start, time_range.stop, tuple(commodities), style, method)
+
+
+def disparity_figure(engine, time_range, commodities, index, style, level=BASE_LEVEL):
+    """Garis indeks ketimpangan `index` antar wilayah tingkat `level` per bulan."""
+    return _disparity_figure(engine, time_range.start, time_range.stop, tuple(commodities), index, style, level)
+
+
+def rolling_corr_figure(engine, window, commodity_a, commodity_b, style):
+    """Garis korelasi bergulir `window` bulan untuk sepasang komoditas."""
+    return _rolling_corr_figure(engine, window, commodity_a, commodity_b, style)
+
+
+def lead_lag_figure(engine, reference, max_lag, per_region, style):
+    """Heatmap korelasi silang `reference` terhadap komoditas lain per lag."""
+    return _lead_lag_figure(engine, reference, max_lag, per_region, style)
+
+
+# ==============================
+# BUILDER
+# ==============================
+@_memo
+def _trend_figure(engine, start, stop, commodities, style):
+    avg_trend = engine.national_mean("clean", slice(start, stop), commodities)
+    months = avg_trend.index.strftime("%Y-%m")
+
+    fig = go.Figure()
+    for col in commodities:
+        fig.add_trace(go.Scatter(
+            x=months,
+            y=_rupiah(avg_trend[col]),
+            mode="lines+markers",
+            name=col,
+            hovertemplate="%{x|%b %Y}<br>Rp%{y:,.0f}<extra></extra>"
+        ))
+
+    fig.update_layout(
+        xaxis_title="Periode",
+        yaxis_title="Harga rata-rata (Rp)",
+        hovermode="x unified",
+        template="plotly_white",
+        height=style.trend_height
+    )
+    if style.transparent:
+        fig.update_layout(
+            legend=dict(
+                orientation="h",
+                yanchor="bottom",
+                y=1.02,
+                xanchor="right",
+                x=1
+            )
+        )
+    return _style(fig, style)
+
+
+@_memo
+def _map_figure(engine, start, stop, commodity, style, level, within):
+    # Lookup koordinat di dimensi tingkat wilayah via kode wilayah
+    dim = engine.level_dim(level)
+    if within is not None:
+        dim = dim[dim[within[0]] == within[1]]
+    map_agg = (
+        dim
+        .join(engine.region_mean("wins", slice(start, stop), commodity, level), how="inner")
+        .dropna(subset=["latitude", "longitude", commodity])
+    )
+    if map_agg.empty:
+        return None
+    map_agg[commodity] = _rupiah(map_agg[commodity])
+
+    # Harga cukup dikirim sebagai warna & ukuran marker; hover tanpa customdata
+    # duplikat dan tanpa baris koordinat
+    fig = px.scatter_mapbox(
+        map_agg,
+        lat="latitude",
+        lon="longitude",
+        color=commodity,
+        size=commodity,
+        hover_name=LEVELS[level],
+        color_continuous_scale=style.map_colorscale,
+        zoom=4,
+        height=style.map_height
+    )
+    fig.update_traces(
+        hovertemplate=f"<b>%{{hovertext}}</b><br>{commodity}: Rp %{{marker.color:,.0f}}<extra></extra>"
+    )
+    fig.update_layout(
+        mapbox_style="open-street-map",
+        margin=dict(l=0, r=0, t=30, b=0)
+    )
+    return _style(fig, style, plot_bg=False)
+
+
+@_memo
+def _grid_map_figure(engine, start, stop, commodity, shape, size, style):
+    cells = engine.spatial_bins("wins", slice(start, stop), commodity, shape, size)
+    if cells.empty:
+        return None
+    count = cells["count"].to_numpy()
+
+    fig = go.Figure(go.Scattermapbox(
+        lat=cells["latitude"].to_numpy(dtype=np.float32),
+        lon=cells["longitude"].to_numpy(dtype=np.float32),
+        mode="markers",
+        marker=dict(
+            color=_rupiah(cells["mean"]),
+            colorscale=style.map_colorscale,
+            colorbar=dict(title=commodity),
+            # Luas penanda sebanding jumlah Kab/Kota dalam sel
+            size=np.round(8 + 22 * np.sqrt(count / count.max()), 1).astype(np.float32),
+            opacity=0.85,
+        ),
+        customdata=np.column_stack([_rupiah(cells["min"]), _rupiah(cells["max"]), count]),
+        hovertemplate=(
+            "<b>%{customdata[2]} Kab/Kota</b><br>"
+            f"{commodity}: Rp %{{marker.color:,.0f}}<br>"
+            "Min Rp %{customdata[0]:,.0f} – Maks Rp %{customdata[1]:,.0f}<extra></extra>"
+        ),
+    ))
+    fig.update_layout(
+        mapbox=dict(
+            style="open-street-map",
+            zoom=4,
+            center=dict(lat=float(cells["latitude"].mean()), lon=float(cells["longitude"].mean())),
+        ),
+        height=style.map_height,
+        margin=dict(l=0, r=0, t=30, b=0)
+    )
+    return _style(fig, style, plot_bg=False)
+
+
+@_memo
+def _lisa_map_figure(engine, start, stop, commodity, style):
+    _, lisa = engine.spatial_autocorr("wins", slice(start, stop), commodity)
+    points = (
+        engine.regions
+        .join(lisa)
+        .join(engine.region_mean("wins", slice(start, stop), commodity))
+        .dropna(subset=["latitude", "longitude", commodity])
+    )
+    if points.empty:
+        return None
+
+    fig = go.Figure()
+    # Satu trace per klaster agar legenda bisa dipakai untuk menyaring
+    for cluster, color in LISA_COLORS.items():
+        part = points[points["Klaster"] == cluster]
+        if part.empty:
+            continue
+        fig.add_trace(go.Scattermapbox(
+            lat=part["latitude"].to_numpy(dtype=np.float32),
+            lon=part["longitude"].to_numpy(dtype=np.float32),
+            mode="markers",
+            marker=dict(color=color, size=9 if cluster == "Tidak signifikan" else 12),
+            name=f"{cluster} ({len(part)})",
+            text=part["Kab/Kota"],
+            customdata=np.column_stack([_rupiah(part[commodity]), np.round(part["p"].to_numpy(), 3)]),
+            hovertemplate=(
+                f"<b>%{{text}}</b><br>{cluster}<br>{commodity}: Rp %{{customdata[0]:,.0f}}"
+                "<br>p = %{customdata[1]}<extra></extra>"
+            ),
+        ))
+    fig.update_layout(
+        mapbox=dict(
+            style="open-street-map",
+            zoom=4,
+            center=dict(lat=float(points["latitude"].mean()), lon=float(points["longitude"].mean())),
+        ),
+        legend=dict(orientation="h", yanchor="bottom", y=1.0, xanchor="left", x=0),
+        height=style.map_height,
+        margin=dict(l=0, r=0, t=30, b=0)
+    )
+    return _style(fig, style, plot_bg=False)
+
+
+@_memo
+def _rank_figure(engine, start, stop, commodity, n, highest, style, level, within):
+    # Permutasi peringkat di-cache mesin per (komoditas, rentang, tingkat):
+    # geser slider n atau ganti induk cukup menyaring & mengiris; bar
+    # teratas = peringkat pertama
+    name_col = LEVELS[level]
+    top = engine.top_regions("wins", slice(start, stop), commodity, n, highest, level, within)
+    top = engine.level_dim(level).loc[top.index, [name_col]].assign(**{commodity: _rupiah(top)}).iloc[::-1]
+    n = len(top)
+    if highest:
+        title = f"{n} {name_col} dengan Harga Tertinggi ({commodity})"
+        color = style.bar_high_color
+    else:
+        title = f"{n} {name_col} dengan Harga Terendah ({commodity})"
+        color = style.bar_low_color
+
+    fig = px.bar(
+        top,
+        x=commodity,
+        y=name_col,
+        orientation="h",
+        title=title,
+        template="plotly_white"
+    )
+    fig.update_traces(
+        hovertemplate="<b>%{y}</b><br>Rp %{x:,.0f}<extra></extra>",
+        marker_color=color
+    )
+    return _style(fig, style)
+
+
+@_memo
+def _corr_figure(engine, start, stop, commodities, style, method):
+    # Dua desimal sesuai label heatmap; float64 dipertahankan agar teks
+    # `text_auto=True` ("%{z}") tidak menampilkan artefak float32
+    corr = engine.corr("wins", slice(start, stop), commodities, method).round(2)
+
+    fig = px.imshow(
+        corr,
+        text_auto=style.corr_text_format,
+        color_continuous_scale="RdBu_r",
+        zmin=-1, zmax=1,
+        labels=dict(color="Korelasi")
+    )
+    fig.update_layout(
+        template="plotly_white",
+        height=style.corr_height
+    )
+    return _style(fig, style, plot_bg=False)
+
+
+@_memo
+def _disparity_figure(engine, start, stop, commodities, index, style, level):
+    disparity = engine.disparity("wins", slice(start, stop), commodities, index, level).round(3)
+    months = disparity.index.strftime("%Y-%m")
+    # Gini & CV berskala 0–1, rasio berskala >= 1
+    value_format = ".3f" if index in ("cv", "gini") else ".2f"
+
+    fig = go.Figure()
+    for col in commodities:
+        fig.add_trace(go.Scatter(
+            x=months,
+            y=disparity[col].to_numpy(),
+            mode="lines+markers",
+            name=col,
+            hovertemplate=f"%{{x|%b %Y}}<br>%{{y:{value_format}}}<extra></extra>"
+        ))
+
+    fig.update_layout(
+        xaxis_title="Periode",
+        yaxis_title=DISPARITY_TITLES[index],
+        hovermode="x unified",
+        template="plotly_white",
+        height=style.disparity_height
+    )
+    return _style(fig, style)
+
+
+@_memo
+def _rolling_corr_figure(engine, window, commodity_a, commodity_b, style):
+    rolling = engine.rolling_corr("wins", window, commodity_a, commodity_b).dropna().round(2)
+    overall = engine.corr("wins", slice(None), [commodity_a, commodity_b]).iat[0, 1]
+
+    fig = go.Figure(go.Scatter(
+        x=rolling.index.strftime("%Y-%m"),
+        y=rolling.to_numpy(),
+        mode="lines+markers",
+        name=f"Jendela {window} bulan",
+        hovertemplate="%{x|%b %Y}<br>Korelasi %{y:.2f}<extra></extra>"
+    ))
+    # Garis acuan: korelasi seluruh periode untuk pasangan yang sama
+    fig.add_hline(
+        y=round(float(overall), 2),
+        line_dash="dash",
+        line_color="#6b7280",
+        annotation_text=f"Seluruh periode: {overall:.2f}",
+        annotation_position="bottom right"
+    )
+    fig.update_layout(
+        title=f"{commodity_a} vs {commodity_b}",
+        xaxis_title="Bulan akhir jendela",
+        yaxis_title="Korelasi Pearson",
+        yaxis_range=[-1.05, 1.05],
+        template="plotly_white",
+        height=style.rolling_height
+    )
+    return _style(fig, style)
+
+
+@_memo
+def _lead_lag_figure(engine, reference, max_lag, per_region, style):
+    lead_lag = engine.lead_lag("wins", reference, max_lag, per_region).round(2)
+    # Lag dominan (|korelasi| terbesar di dalam jendela lag) tiap baris ditandai
+    window = engine.lag_window("wins", max_lag)
+    inside = np.abs(lead_lag.columns.to_numpy()) <= window
+    best = np.where(inside, lead_lag.abs().fillna(-1).to_numpy(), -2).argmax(axis=1)
+
+    fig = px.imshow(
+        lead_lag,
+        x=[f"{lag:+d}" for lag in lead_lag.columns],
+        text_auto=style.corr_text_format,
+        color_continuous_scale="RdBu_r",
+        zmin=-1, zmax=1,
+        aspect="auto",
+        labels=dict(x="Lag (bulan)", y="", color="Korelasi")
+    )
+    fig.add_trace(go.Scatter(
+        x=[f"{lead_lag.columns[i]:+d}" for i in best],
+        y=list(lead_lag.index),
+        mode="markers",
+        marker=dict(symbol="square-open", size=26, color="#111827", line=dict(width=2)),
+        hoverinfo="skip",
+        showlegend=False
+    ))
+    fig.update_layout(
+        title=f"{reference}(t) vs komoditas lain (t + lag)",
+        template="plotly_white",
+        height=style.lead_lag_height
+    )
+    return _style(fig, style, plot_bg=False)
@@ -0,0 +1,182 @@
+"""
+Pembacaan CSV harga pangan dengan cache kolumnar (Parquet) di samping file CSV.
+
+CSV hanya di-parse ulang jika ukuran, mtime, atau hash isi file sumber berubah.
+Selebihnya data dibaca langsung dari Parquet yang sudah bertipe (lihat
+`hargapangan.schema`), sehingga cold start tidak perlu parsing teks lagi.
+"""
+
+import hashlib
+import json
+import os
+
+import pandas as pd
+
+from hargapangan.regions import attach_region_id, build_region_dim
+from hargapangan.schema import MONTH_COL, csv_dtypes, month_number, parse_periode
+
+try:
+    import pyarrow  # noqa: F401  (dipakai pandas untuk Parquet)
+    HAS_PARQUET = True
+except ImportError:  # pragma: no cover - pyarrow ikut terpasang bersama streamlit
+    HAS_PARQUET = False
+
+CACHE_DIRNAME = ".cache"
+# Naikkan jika cara parsing CSV berubah agar cache lama otomatis dibuang
+CACHE_VERSION = 3
+
+
+def _file_hash(path, chunk_size=1 << 20):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def file_fingerprint(path):
+    """Ukuran, mtime, dan hash SHA-256 file; dipakai untuk validasi cache & bundle."""
+    stat = os.stat(path)
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha256": _file_hash(path)}
+
+
+def same_file(path, fingerprint):
+    """
+    True jika isi `path` masih sama dengan `fingerprint`. Ukuran + mtime dicek
+    lebih dulu; hash hanya dihitung jika mtime berubah tetapi ukuran sama.
+    """
+    stat = os.stat(path)
+    if fingerprint.get("size") != stat.st_size:
+        return False
+    if fingerprint.get("mtime_ns") == stat.st_mtime_ns:
+        return True
+    return fingerprint.get("sha256") == _file_hash(path)
+
+
+def _cache_paths(csv_path):
+    folder, name = os.path.split(os.path.abspath(csv_path))
+    stem = os.path.splitext(name)[0]
+    cache_dir = os.path.join(folder, CACHE_DIRNAME)
+    return (
+        cache_dir,
+        os.path.join(cache_dir, stem + ".parquet"),
+        os.path.join(cache_dir, stem + ".meta.json"),
+    )
+
+
+def _read_meta(meta_path):
+    try:
+        with open(meta_path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _dump_meta(path, meta):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(meta, f)
+
+
+def _write_atomic(path, write_fn):
+    # Tulis ke file sementara lalu rename, supaya proses lain tidak pernah
+    # membaca file cache yang setengah jadi
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        write_fn(tmp_path)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def parse_price_csv(csv_path):
+    """Parse CSV harga pangan (tanpa cache) sesuai skema di `hargapangan.schema`."""
+    header = pd.read_csv(csv_path, nrows=0).columns.tolist()
+
+    # Pastikan kolom tanggal benar
+    if "Periode" not in header:
+        header[0] = "Periode"
+
+    df = pd.read_csv(
+        csv_path,
+        header=0,
+        names=header,
+        dtype=csv_dtypes(header),
+    )
+    df["Periode"] = parse_periode(df["Periode"])
+    df[MONTH_COL] = month_number(df["Periode"].dt).astype("int16")
+    return df
+
+
+def read_csv_cached(csv_path):
+    """
+    Baca CSV harga pangan lewat cache Parquet di `<folder CSV>/.cache/`.
+
+    Validasi cache: ukuran + mtime dicek lebih dulu (murah). Jika mtime berubah
+    tetapi ukuran sama (misalnya file di-checkout ulang), hash SHA-256 isi file
+    dibandingkan sebelum memutuskan untuk mem-parse ulang.
+    Melempar FileNotFoundError jika CSV sumber tidak ada.
+    """
+    stat = os.stat(csv_path)
+    if not HAS_PARQUET:
+        return parse_price_csv(csv_path)
+
+    cache_dir, parquet_path, meta_path = _cache_paths(csv_path)
+    meta = _read_meta(meta_path)
+
+    if meta and meta.get("version") == CACHE_VERSION and meta.get("size") == stat.st_size \
+            and os.path.exists(parquet_path):
+        fresh = meta.get("mtime_ns") == stat.st_mtime_ns
+        if not fresh and meta.get("sha256") == _file_hash(csv_path):
+            # Isi sama, hanya mtime yang berubah: perbarui meta saja
+            meta["mtime_ns"] = stat.st_mtime_ns
+            fresh = True
+            try:
+                _write_atomic(meta_path, lambda p: _dump_meta(p, meta))
+            except OSError:
+                pass
+        if fresh:
+            try:
+                return pd.read_parquet(parquet_path)
+            except Exception:
+                # Cache rusak: jatuh ke parsing ulang di bawah
+                pass
+
+    df = parse_price_csv(csv_path)
+    meta = {"version": CACHE_VERSION, **file_fingerprint(csv_path)}
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        _write_atomic(parquet_path, lambda p: df.to_parquet(p, index=False))
+        _write_atomic(meta_path, lambda p: _dump_meta(p, meta))
+    except OSError:
+        # Folder data read-only (misalnya di hosting): tetap jalan tanpa cache
+        pass
+    return df
+
+
+def load_tables(clean_path, wins_path, geo_path, province_path=None, use_cache=True):
+    """
+    Muat tabel fakta `clean` dan `wins` beserta dimensi wilayah.
+
+    File geospasial hanya dipakai untuk mengambil koordinat per Kab/Kota; harga
+    di dalamnya identik dengan tabel winsor sehingga tidak disimpan lagi. Jika
+    file geospasial tidak ada, koordinat di dimensi wilayah bernilai NaN.
+    `province_path` (CSV Kab/Kota -> Provinsi) menambahkan hierarki wilayah
+    jika filenya ada.
+    `use_cache=False` selalu mem-parse CSV (untuk pengukuran cold start).
+    """
+    read = read_csv_cached if use_cache else parse_price_csv
+    clean = read(clean_path)
+    wins = read(wins_path)
+    try:
+        geo = read(geo_path)
+    except FileNotFoundError:
+        geo = None
+
+    provinces = None
+    if province_path is not None and os.path.exists(province_path):
+        # Tabel kecil (satu baris per Kab/Kota), tidak perlu cache Parquet
+        provinces = pd.read_csv(province_path, dtype=str)
+
+    regions = build_region_dim(geo, clean, wins, provinces=provinces)
+    return attach_region_id(clean, regions), attach_region_id(wins, regions), regions
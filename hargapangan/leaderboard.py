@@ -0,0 +1,95 @@
+"""
+Papan peringkat lengkap seluruh Kab/Kota untuk satu rentang bulan.
+
+Saat dibangun, setiap kolom metrik (rata-rata dan perubahan bulanan tiap
+komoditas) langsung diberi permutasi urut menurun dan naik serta array
+peringkatnya. Mengurutkan ulang tabel berarti memilih permutasi yang sudah ada,
+dan halaman tabel hanya merakit baris × kolom yang tampil, sehingga
+browser tidak pernah menerima 505 baris × 20 komoditas sekaligus.
+"""
+
+import numpy as np
+import pandas as pd
+
+from hargapangan.cube import top_n_index
+from hargapangan.regions import REGION_COL
+
+# Metrik per komoditas -> akhiran nama kolom tabel
+METRICS = {"mean": "", "mom": " MoM (%)"}
+RANK_SUFFIX = " #"
+
+
+def _full_order(values, descending=True):
+    # Urutan tanpa NaN (nilai kembar menurut region_id), lalu wilayah tanpa data di ekor
+    ranked = top_n_index(values, highest=descending)
+    missing = np.flatnonzero(np.isnan(values))
+    return np.concatenate([ranked, missing]), ranked.size
+
+
+class Leaderboard:
+    """
+    Tabel seluruh wilayah untuk satu rentang bulan.
+
+    - `mean`: rata-rata rentang per wilayah, (R, K)
+    - `mom`: perubahan bulan terakhir rentang terhadap bulan sebelumnya (%), (R, K)
+    - `rank`: peringkat rata-rata (1 = termahal), (R, K); 0 jika tanpa data
+    Urutan wilayah (`region_id`) sama dengan urutan abjad Kab/Kota.
+    """
+
+    def __init__(self, names, commodities, mean, mom):
+        self.names = np.asarray(names, dtype=object)
+        self.commodities = list(commodities)
+        self._col = {c: i for i, c in enumerate(self.commodities)}
+        self.mean = mean
+        self.mom = mom
+        self._lower = np.char.lower(self.names.astype(str))
+
+        # Permutasi + jumlah baris valid per (metrik, komoditas, menurun)
+        self._orders = {}
+        for metric in METRICS:
+            values = getattr(self, metric)
+            for kom, k in self._col.items():
+                for descending in (True, False):
+                    self._orders[metric, kom, descending] = _full_order(values[:, k], descending)
+
+        self.rank = np.zeros(mean.shape, dtype=np.int32)
+        for kom, k in self._col.items():
+            order, n_valid = self._orders["mean", kom, True]
+            self.rank[order[:n_valid], k] = np.arange(1, n_valid + 1)
+
+    @classmethod
+    def from_cube(cls, cube, names, time_range):
+        return cls(names, cube.commodities, cube.range_mean(time_range), cube.mom_change(time_range))
+
+    def __len__(self):
+        return len(self.names)
+
+    def order(self, metric=None, commodity=None, descending=True, query=""):
+        """
+        Permutasi `region_id` untuk urutan tabel. Tanpa `metric` urut abjad
+        Kab/Kota; `query` menyaring nama yang memuat teks tersebut.
+        """
+        if metric is None:
+            order = np.arange(len(self.names))
+            if descending:
+                order = order[::-1]
+        else:
+            order, _ = self._orders[metric, commodity, descending]
+        query = query.strip().lower()
+        if query:
+            order = order[np.char.find(self._lower[order], query) >= 0]
+        return order
+
+    def page(self, order, page, page_size, commodities):
+        """Satu halaman tabel: baris `order` ke-`page` (mulai 0) untuk `commodities`."""
+        rows = order[page * page_size:(page + 1) * page_size]
+        table = {REGION_COL: self.names[rows]}
+        for kom in commodities:
+            k = self._col[kom]
+            table[kom] = np.round(self.mean[rows, k])
+            table[kom + METRICS["mom"]] = np.round(self.mom[rows, k], 1)
+            ranks = self.rank[rows, k]
+            table[kom + RANK_SUFFIX] = pd.arrays.IntegerArray(ranks, ranks == 0)
+        frame = pd.DataFrame(table)
+        frame.insert(0, "No", np.arange(page * page_size + 1, page * page_size + len(rows) + 1))
+        return frame
@@ -0,0 +1,157 @@
+"""
+Dimensi wilayah (Kab/Kota) dan penghubungnya ke tabel fakta harga.
+
+Koordinat cukup disimpan sekali per wilayah di tabel dimensi (505 baris);
+tabel fakta hanya membawa `region_id` (int16) yang sama dengan kode kategori
+kolom Kab/Kota, sehingga agregasi per wilayah cukup group-by pada kunci integer
+lalu lookup ke dimensi.
+
+Hierarki Kab/Kota -> Provinsi -> kelompok pulau juga disimpan di dimensi ini
+sebagai kolom kategori; kode kategorinya menjadi indeks sumbu R kubus agregat
+per tingkat (lihat `PriceCube.rollup`).
+"""
+
+import numpy as np
+import pandas as pd
+
+REGION_COL = "Kab/Kota"
+REGION_ID = "region_id"
+COORD_COLS = ["latitude", "longitude"]
+PROVINCE_COL = "Provinsi"
+ISLAND_COL = "Pulau"
+MEMBER_COL = "Jumlah Kab/Kota"
+
+# Tingkat wilayah dari yang terhalus -> kolom nama di dimensi wilayah
+BASE_LEVEL = "kabkota"
+LEVELS = {BASE_LEVEL: REGION_COL, "provinsi": PROVINCE_COL, "pulau": ISLAND_COL}
+
+# Kelompok pulau (barat ke timur) -> provinsi anggotanya
+ISLAND_GROUPS = {
+    "Sumatera": [
+        "Aceh", "Sumatera Utara", "Sumatera Barat", "Riau", "Kepulauan Riau", "Jambi",
+        "Sumatera Selatan", "Kepulauan Bangka Belitung", "Bengkulu", "Lampung",
+    ],
+    "Jawa": ["DKI Jakarta", "Jawa Barat", "Banten", "Jawa Tengah", "DI Yogyakarta", "Jawa Timur"],
+    "Bali & Nusa Tenggara": ["Bali", "Nusa Tenggara Barat", "Nusa Tenggara Timur"],
+    "Kalimantan": [
+        "Kalimantan Barat", "Kalimantan Tengah", "Kalimantan Selatan", "Kalimantan Timur",
+        "Kalimantan Utara",
+    ],
+    "Sulawesi": [
+        "Sulawesi Utara", "Gorontalo", "Sulawesi Tengah", "Sulawesi Barat", "Sulawesi Selatan",
+        "Sulawesi Tenggara",
+    ],
+    "Maluku": ["Maluku", "Maluku Utara"],
+    "Papua": [
+        "Papua Barat", "Papua Barat Daya", "Papua", "Papua Tengah", "Papua Pegunungan",
+        "Papua Selatan",
+    ],
+}
+
+
+def build_region_dim(geo=None, *facts, provinces=None):
+    """
+    Bangun tabel dimensi wilayah: index `region_id`, kolom Kab/Kota, latitude,
+    longitude. Wilayah yang hanya ada di tabel fakta tetap dimasukkan dengan
+    koordinat NaN. Jika `provinces` (tabel Kab/Kota -> Provinsi) diberikan,
+    kolom Provinsi dan Pulau ikut ditambahkan (lihat `attach_hierarchy`).
+    """
+    names = set()
+    for df in (geo, *facts):
+        if df is not None and REGION_COL in df.columns:
+            names.update(df[REGION_COL].dropna().astype(str).unique())
+
+    regions = pd.DataFrame({REGION_COL: sorted(names)})
+    if geo is not None and all(c in geo.columns for c in COORD_COLS):
+        coords = (
+            geo[[REGION_COL, *COORD_COLS]]
+            .dropna(subset=COORD_COLS)
+            .astype({REGION_COL: str})
+            .drop_duplicates(REGION_COL)
+        )
+        regions = regions.merge(coords, on=REGION_COL, how="left")
+    else:
+        for c in COORD_COLS:
+            regions[c] = np.nan
+    regions = regions.astype({c: "float32" for c in COORD_COLS})
+    regions[REGION_COL] = pd.Categorical(regions[REGION_COL], categories=regions[REGION_COL])
+    regions.index = pd.RangeIndex(len(regions), name=REGION_ID)
+    if provinces is not None:
+        regions = attach_hierarchy(regions, provinces)
+    return regions
+
+
+def attach_hierarchy(regions, provinces):
+    """
+    Tambahkan kolom Provinsi dan Pulau ke dimensi wilayah dari tabel
+    `provinces` (kolom Kab/Kota, Provinsi). Kab/Kota yang tidak terdaftar,
+    atau provinsinya tidak ada di `ISLAND_GROUPS`, bernilai NaN di tingkat itu.
+    """
+    mapping = provinces.astype(str).drop_duplicates(REGION_COL).set_index(REGION_COL)[PROVINCE_COL]
+    province = regions[REGION_COL].astype(str).map(mapping)
+    island_of = {prov: island for island, members in ISLAND_GROUPS.items() for prov in members}
+
+    regions = regions.copy()
+    regions[PROVINCE_COL] = pd.Categorical(province, categories=sorted(province.dropna().unique()))
+    regions[ISLAND_COL] = pd.Categorical(province.map(island_of), categories=list(ISLAND_GROUPS))
+    return regions
+
+
+def available_levels(regions):
+    """Tingkat wilayah yang tersedia di dimensi ini, dari yang terhalus."""
+    return [
+        level for level, col in LEVELS.items()
+        if level == BASE_LEVEL or (col in regions.columns and regions[col].notna().any())
+    ]
+
+
+def level_codes(regions, level):
+    """
+    Kode grup tingkat `level` untuk tiap `region_id` (-1 jika tanpa grup)
+    beserta jumlah grup; tingkat Kab/Kota memetakan tiap wilayah ke dirinya.
+    """
+    col = regions[LEVELS[level]]
+    return col.cat.codes.to_numpy(), len(col.cat.categories)
+
+
+def level_dim(regions, level):
+    """
+    Tabel dimensi tingkat `level`: index kode grup, kolom nama, titik tengah
+    koordinat anggota, jumlah Kab/Kota, dan kolom tingkat yang lebih kasar.
+    Tingkat Kab/Kota mengembalikan `regions` apa adanya.
+    """
+    if level == BASE_LEVEL:
+        return regions
+    levels = list(LEVELS)
+    col = LEVELS[level]
+    parents = [LEVELS[up] for up in levels[levels.index(level) + 1:] if LEVELS[up] in regions.columns]
+    codes, n_groups = level_codes(regions, level)
+    members = regions.assign(_code=codes)[codes >= 0]
+
+    grouped = members.groupby("_code")
+    dim = pd.DataFrame(index=pd.RangeIndex(n_groups, name=f"{level}_id"))
+    dim[col] = pd.Categorical.from_codes(np.arange(n_groups), regions[col].cat.categories)
+    for c in COORD_COLS:
+        dim[c] = grouped[c].mean().astype("float32")
+    dim[MEMBER_COL] = grouped.size().reindex(dim.index, fill_value=0)
+    for parent in parents:
+        # Satu grup selalu berada di satu induk: ambil dari anggota pertama
+        dim[parent] = grouped[parent].first().reindex(dim.index)
+    return dim
+
+
+def attach_region_id(df, regions):
+    """
+    Seragamkan kategori Kab/Kota dengan dimensi wilayah dan tambahkan kolom
+    `region_id`. Koordinat per baris dibuang karena sudah ada di dimensi.
+    """
+    df = df.drop(columns=[c for c in COORD_COLS if c in df.columns])
+    df[REGION_COL] = pd.Categorical(
+        df[REGION_COL].astype(str), categories=regions[REGION_COL].cat.categories
+    )
+    df[REGION_ID] = df[REGION_COL].cat.codes.astype("int16")
+    return df
+
+
+def has_coordinates(regions):
+    return regions is not None and regions[COORD_COLS].notna().all(axis=1).any()
@@ -0,0 +1,116 @@
+"""
+Skema kolom data harga pangan.
+
+Semua loader memakai skema yang sama: komoditas sebagai float32, Kab/Kota dan
+Bulan sebagai kategori, Periode di-parse dengan format tetap, dan flag sebagai
+bool. Kolom yang tidak dikenal dianggap kolom komoditas (harga, float32).
+"""
+
+import numpy as np
+import pandas as pd
+
+BULAN = [
+    "Januari", "Februari", "Maret", "April", "Mei", "Juni",
+    "Juli", "Agustus", "September", "Oktober", "November", "Desember",
+]
+
+PERIODE_FORMAT = "%Y-%m-%d"
+
+# Indeks bulan bilangan bulat: jumlah bulan sejak Januari 2024
+MONTH_ORIGIN_YEAR = 2024
+MONTH_COL = "bulan_ke"
+
+# Kolom teknis / non-komoditas beserta tipenya
+META_DTYPES = {
+    "Kab/Kota": "category",
+    "Tahun": "int16",
+    "Bulan": pd.CategoricalDtype(BULAN, ordered=True),
+    "Bulan_num": "int8",
+    "bulan_num": "int8",
+    "SPHP_covered": "bool",
+    "latitude": "float32",
+    "longitude": "float32",
+    "region_id": "int16",
+    MONTH_COL: "int16",
+}
+META_COLS = set(META_DTYPES) | {"Periode"}
+
+PRICE_DTYPE = "float32"
+
+
+def csv_dtypes(columns):
+    """Peta dtype untuk `pd.read_csv` berdasarkan daftar kolom header."""
+    return {
+        c: META_DTYPES.get(c, PRICE_DTYPE)
+        for c in columns
+        if c != "Periode"
+    }
+
+
+def parse_periode(values):
+    return pd.to_datetime(values, format=PERIODE_FORMAT)
+
+
+def month_number(value):
+    """Tanggal/Timestamp/DatetimeIndex -> indeks bulan sejak Januari 2024."""
+    return (value.year - MONTH_ORIGIN_YEAR) * 12 + value.month - 1
+
+
+def month_start(number):
+    """Kebalikan `month_number`: indeks bulan -> DatetimeIndex awal bulan."""
+    number = np.asarray(number)
+    return pd.DatetimeIndex(
+        pd.to_datetime({"year": MONTH_ORIGIN_YEAR + number // 12, "month": number % 12 + 1, "day": 1})
+    )
+
+
+def apply_schema(df):
+    """Samakan tipe DataFrame yang sudah ada (mis. data dummy) dengan skema."""
+    dtypes = {
+        c: t for c, t in csv_dtypes(df.columns).items()
+        if pd.api.types.is_numeric_dtype(df[c]) or c in META_DTYPES
+    }
+    df = df.astype(dtypes)
+    if "Periode" in df.columns and not pd.api.types.is_datetime64_any_dtype(df["Periode"]):
+        df["Periode"] = parse_periode(df["Periode"])
+    if "Periode" in df.columns:
+        df[MONTH_COL] = month_number(df["Periode"].dt).astype("int16")
+    return df
+
+
+def komoditas_columns(df):
+    """Kolom komoditas = semua kolom harga di luar kolom teknis."""
+    return [
+        c for c in df.columns
+        if c not in META_COLS and pd.api.types.is_numeric_dtype(df[c])
+    ]
+
+
+# Kata kunci kelompok komoditas (dipakai di Tab Tren Nasional)
+KELOMPOK_KATA_KUNCI = {
+    "Beras": ["beras"],
+    "Protein Hewani": ["daging", "telur", "ikan"],
+    "Bumbu Dapur": ["cabai", "cabe", "bawang"],
+    "Bahan Pokok Lain": ["minyak", "gula", "tepung", "kedelai", "garam"],
+}
+
+
+def commodity_groups(komoditas_cols):
+    """Kelompok komoditas: "Semua" + kelompok berdasarkan kata kunci nama."""
+    groups = {"Semua": list(komoditas_cols)}
+    for nama, kata_kunci in KELOMPOK_KATA_KUNCI.items():
+        groups[nama] = [c for c in komoditas_cols if any(k in c.lower() for k in kata_kunci)]
+    return groups
+
+
+# Nama komoditas virtual biaya keranjang pangan (lihat `PriceCube.basket`)
+BASKET_COL = "Keranjang Pangan"
+
+
+def basket_presets(groups):
+    """
+    Preset keranjang dari kelompok komoditas: nama kelompok -> {komoditas: 1}
+    (satu satuan harga, mis. 1 kg, tiap komoditas anggota). Kelompok kosong
+    dilewati.
+    """
+    return {nama: dict.fromkeys(koms, 1.0) for nama, koms in groups.items() if koms}
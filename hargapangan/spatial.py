@@ -0,0 +1,306 @@
+"""
+Agregasi spasial titik Kab/Kota ke sel grid heksagon atau persegi.
+
+Penempatan wilayah ke sel hanya bergantung pada koordinat dan resolusi, jadi
+dihitung sekali per (bentuk, ukuran sel). Agregat harga per sel (rata-rata,
+minimum, maksimum, jumlah wilayah) untuk satu komoditas & rentang bulan
+kemudian cukup `bincount`/`reduceat` atas vektor rata-rata per wilayah,
+sehingga peta mengirim ratusan sel alih-alih ribuan titik.
+
+Koordinat diperlakukan sebagai bidang datar lon/lat (ekuirektangular): di
+sekitar khatulistiwa distorsinya kecil untuk keperluan tampilan.
+
+Untuk kueri ketetanggaan (radius, k tetangga terdekat, lag spasial) dipakai
+`RegionIndex`: titik dipetakan ke vektor satuan 3D sehingga jarak tali busur
+(chordal) berurutan sama dengan jarak haversine. Dengan scipy indeks memakai
+`cKDTree`; tanpa scipy matriks jarak penuh dihitung sekali (505² kecil).
+"""
+
+import numpy as np
+import pandas as pd
+
+try:
+    from scipy.spatial import cKDTree
+    HAS_SCIPY = True
+except ImportError:  # scipy opsional: tanpa scipy dipakai pencarian brute-force
+    HAS_SCIPY = False
+
+GRID_SHAPES = ("hex", "square")
+SQRT3 = np.sqrt(3.0)
+EARTH_RADIUS_KM = 6371.0088
+
+
+def _hex_round(q, r):
+    # Pembulatan koordinat aksial pecahan ke heksagon terdekat (cube rounding)
+    s = -q - r
+    rq, rr, rs = np.rint(q), np.rint(r), np.rint(s)
+    dq, dr, ds = np.abs(rq - q), np.abs(rr - r), np.abs(rs - s)
+    fix_q = (dq > dr) & (dq > ds)
+    fix_r = ~fix_q & (dr > ds)
+    rq = np.where(fix_q, -rr - rs, rq)
+    rr = np.where(fix_r, -rq - rs, rr)
+    return rq.astype(np.int64), rr.astype(np.int64)
+
+
+def assign_cells(lat, lon, shape="hex", size=1.0):
+    """
+    Tempatkan titik ke sel grid berukuran `size` derajat (heksagon: jarak
+    pusat ke sudut; persegi: panjang sisi). Mengembalikan (`cell`, `centers`):
+    nomor sel per titik (-1 jika koordinat NaN) dan DataFrame pusat sel
+    (`latitude`, `longitude`) berindeks nomor sel.
+    """
+    lat = np.asarray(lat, dtype=np.float64)
+    lon = np.asarray(lon, dtype=np.float64)
+    valid = ~(np.isnan(lat) | np.isnan(lon))
+    if shape == "hex":
+        # Heksagon pointy-top dalam koordinat aksial (q, r)
+        q = (SQRT3 / 3 * lon[valid] - lat[valid] / 3) / size
+        r = (2 / 3 * lat[valid]) / size
+        a, b = _hex_round(q, r)
+        center_lon = size * SQRT3 * (a + b / 2)
+        center_lat = size * 1.5 * b
+    elif shape == "square":
+        a = np.floor(lon[valid] / size).astype(np.int64)
+        b = np.floor(lat[valid] / size).astype(np.int64)
+        center_lon = (a + 0.5) * size
+        center_lat = (b + 0.5) * size
+    else:
+        raise ValueError(f"Bentuk grid tidak dikenal: {shape!r} (pilih {GRID_SHAPES})")
+
+    keys, first, inverse = np.unique(np.stack([a, b], axis=1), axis=0, return_index=True, return_inverse=True)
+    cell = np.full(lat.shape, -1, dtype=np.int64)
+    cell[valid] = inverse.ravel()
+    centers = pd.DataFrame(
+        {"latitude": center_lat[first], "longitude": center_lon[first]},
+        index=pd.RangeIndex(len(keys), name="cell"),
+    )
+    return cell, centers
+
+
+def bin_values(cell, centers, values):
+    """
+    Agregat `values` per sel (titik NaN atau tanpa sel diabaikan): DataFrame
+    pusat sel + `mean`, `min`, `max`, `count`, hanya sel yang berisi data.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    ok = (cell >= 0) & ~np.isnan(values)
+    c, v = cell[ok], values[ok]
+    n_cells = len(centers)
+
+    count = np.bincount(c, minlength=n_cells)
+    total = np.bincount(c, weights=v, minlength=n_cells)
+    filled = np.flatnonzero(count)
+
+    # min/max per sel: urutkan per sel lalu reduceat di awal tiap kelompok
+    order = np.argsort(c, kind="stable")
+    starts = np.searchsorted(c[order], filled)
+    sorted_v = v[order]
+    return centers.iloc[filled].assign(
+        mean=total[filled] / count[filled],
+        min=np.minimum.reduceat(sorted_v, starts) if filled.size else [],
+        max=np.maximum.reduceat(sorted_v, starts) if filled.size else [],
+        count=count[filled],
+    )
+
+
+def _unit_vectors(lat, lon):
+    lat, lon = np.radians(lat), np.radians(lon)
+    return np.column_stack([np.cos(lat) * np.cos(lon), np.cos(lat) * np.sin(lon), np.sin(lat)])
+
+
+def chord_to_km(chord):
+    """Jarak tali busur pada bola satuan -> jarak lingkaran besar (km)."""
+    return 2.0 * EARTH_RADIUS_KM * np.arcsin(np.clip(np.asarray(chord) / 2.0, 0.0, 1.0))
+
+
+def km_to_chord(km):
+    return 2.0 * np.sin(np.asarray(km, dtype=np.float64) / (2.0 * EARTH_RADIUS_KM))
+
+
+class RegionIndex:
+    """
+    Indeks spasial atas titik wilayah (jarak haversine). Nomor titik = posisi
+    di `lat`/`lon` (yaitu `region_id`); titik tanpa koordinat tidak pernah
+    muncul sebagai tetangga dan kuerinya kosong.
+    """
+
+    def __init__(self, lat, lon):
+        lat = np.asarray(lat, dtype=np.float64)
+        lon = np.asarray(lon, dtype=np.float64)
+        self.size = lat.size
+        self.ids = np.flatnonzero(~(np.isnan(lat) | np.isnan(lon)))
+        self.xyz = _unit_vectors(lat[self.ids], lon[self.ids])
+        if HAS_SCIPY:
+            self._tree = cKDTree(self.xyz)
+            self._chord = None
+        else:
+            self._tree = None
+            diff = self.xyz[:, None, :] - self.xyz[None, :, :]
+            self._chord = np.sqrt(np.einsum("ijk,ijk->ij", diff, diff))
+        # posisi di indeks untuk tiap nomor titik (-1 tanpa koordinat)
+        self._pos = np.full(self.size, -1, dtype=np.int64)
+        self._pos[self.ids] = np.arange(self.ids.size)
+
+    def within(self, point, radius_km):
+        """
+        Wilayah lain dalam radius `radius_km` dari titik `point`:
+        (nomor titik, jarak km), terurut dari yang terdekat.
+        """
+        pos = self._pos[point]
+        if pos < 0:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+        chord = km_to_chord(radius_km)
+        if self._tree is not None:
+            hits = np.asarray(self._tree.query_ball_point(self.xyz[pos], chord), dtype=np.int64)
+            dist = np.linalg.norm(self.xyz[hits] - self.xyz[pos], axis=1)
+        else:
+            hits = np.flatnonzero(self._chord[pos] <= chord)
+            dist = self._chord[pos, hits]
+        keep = hits != pos
+        hits, dist = hits[keep], dist[keep]
+        order = np.argsort(dist, kind="stable")
+        return self.ids[hits[order]], chord_to_km(dist[order])
+
+    def neighbors(self, k):
+        """
+        Matriks `k` tetangga terdekat seluruh titik (tanpa diri sendiri):
+        (nomor titik (N, k), jarak km (N, k)); baris titik tanpa koordinat
+        berisi -1 dan NaN.
+        """
+        k = min(k, self.ids.size - 1)
+        if self._tree is not None:
+            dist, pos = self._tree.query(self.xyz, k=k + 1)
+            # Buang diri sendiri; jika koordinat kembar menggesernya keluar
+            # dari k + 1 hasil, buang kolom terakhir
+            own = pos == np.arange(len(pos))[:, None]
+            own[~own.any(axis=1), -1] = True
+            dist, pos = dist[~own].reshape(-1, k), pos[~own].reshape(-1, k)
+        else:
+            chord = self._chord.copy()
+            np.fill_diagonal(chord, np.inf)
+            pos = np.argpartition(chord, k - 1, axis=1)[:, :k]
+            dist = np.take_along_axis(chord, pos, axis=1)
+            order = np.argsort(dist, axis=1, kind="stable")
+            pos = np.take_along_axis(pos, order, axis=1)
+            dist = np.take_along_axis(dist, order, axis=1)
+
+        nbr = np.full((self.size, k), -1, dtype=np.int64)
+        km = np.full((self.size, k), np.nan)
+        nbr[self.ids] = self.ids[pos]
+        km[self.ids] = chord_to_km(dist)
+        return nbr, km
+
+
+def spatial_lag(values, nbr):
+    """
+    Rata-rata nilai tetangga per titik (lag spasial, bobot sama): `values`
+    (N, ...) dengan `nbr` (N, k) dari `RegionIndex.neighbors`; NaN diabaikan.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    gathered = values[np.where(nbr >= 0, nbr, 0)]                  # (N, k, ...)
+    valid = (nbr >= 0).reshape(nbr.shape + (1,) * (values.ndim - 1)) & ~np.isnan(gathered)
+    total = np.where(valid, gathered, 0.0).sum(axis=1)
+    count = valid.sum(axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return total / count
+
+
+# Kategori klaster LISA (kuadran scatterplot Moran, hanya jika signifikan)
+LISA_LABELS = {
+    0: "Tidak signifikan",
+    1: "Tinggi-Tinggi",
+    2: "Rendah-Tinggi",
+    3: "Rendah-Rendah",
+    4: "Tinggi-Rendah",
+}
+
+
+# Jumlah permutasi per batch di `moran`: membatasi array sementara (P, n, k)
+PERMUTATION_CHUNK = 100
+
+
+def _valid_weights(values, nbr):
+    # Bobot k-NN terstandar baris atas wilayah yang punya nilai saja: posisi
+    # ringkas (n valid), tetangga (n, k) dalam posisi ringkas (-1 = kosong)
+    ids = np.flatnonzero(~np.isnan(values))
+    pos = np.full(values.shape[0], -1, dtype=np.int64)
+    pos[ids] = np.arange(ids.size)
+    local = np.where(nbr[ids] >= 0, pos[np.where(nbr[ids] >= 0, nbr[ids], 0)], -1)
+    # Tetangga valid dirapatkan ke kiri agar k_i tetangga pertama terisi
+    local = -np.sort(-local, axis=1)
+    n_nbr = (local >= 0).sum(axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        weights = np.where(local >= 0, 1.0 / n_nbr[:, None], 0.0)
+    return ids, local, weights, n_nbr
+
+
+def moran(values, nbr, permutations=999, seed=0):
+    """
+    Moran's I global dan LISA (Anselin) untuk vektor `values` (R,) dengan
+    bobot k-NN terstandar baris dari matriks tetangga `nbr` (R, k). Wilayah
+    tanpa nilai dikeluarkan beserta bobotnya.
+
+    Inferensi memakai permutasi yang di-batch per `PERMUTATION_CHUNK`:
+    global mengacak nilai antar wilayah (c, n), lokal memakai permutasi
+    kondisional dengan satu set undian (c, k) dari n - 1 wilayah lain yang
+    digeser melewati wilayah itu sendiri (seperti `crand` PySAL), sehingga
+    lag acak untuk semua wilayah sekaligus adalah satu gather (c, n, k).
+    Hitungan ekstrem dijumlahkan antar batch, jadi memori puncak tidak
+    bergantung pada `permutations`.
+
+    Mengembalikan (`global`, `local`): dict I, E[I], p_sim, n; dan dict array
+    (R,) `I`, `p`, `quadrant` (1 HH, 2 LH, 3 LL, 4 HL), NaN/0 untuk wilayah
+    tanpa nilai atau tanpa tetangga bernilai.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    ids, local, weights, n_nbr = _valid_weights(values, nbr)
+    n = ids.size
+    out_local = {
+        "I": np.full(values.shape, np.nan),
+        "p": np.full(values.shape, np.nan),
+        "quadrant": np.zeros(values.shape, dtype=np.int8),
+    }
+    if n < 3:
+        return {"I": np.nan, "EI": np.nan, "p_sim": np.nan, "n": n}, out_local
+
+    # Paling banyak n - 1 tetangga bernilai (sudah rapat kiri): kolom sisanya
+    # kosong dan tidak boleh melebihi jumlah undian lokal
+    k = min(local.shape[1], n - 1)
+    local, weights = local[:, :k], weights[:, :k]
+
+    rng = np.random.default_rng(seed)
+    z = values[ids] - values[ids].mean()
+    m2 = (z * z).sum() / n
+    gather = np.where(local >= 0, local, 0)
+    lag = (z[gather] * weights).sum(axis=1)
+    has_nbr = n_nbr > 0
+
+    # Global: I = Σ z_i (Wz)_i / Σ z_i² (W terstandar baris, S0 = n)
+    I_obs = (z * lag)[has_nbr].sum() / (z * z)[has_nbr].sum()
+    I_perm = np.empty(permutations)
+    for lo in range(0, permutations, PERMUTATION_CHUNK):
+        hi = min(lo + PERMUTATION_CHUNK, permutations)
+        perm = rng.permuted(np.broadcast_to(z, (hi - lo, n)), axis=1)
+        lag_perm = (perm[:, gather] * weights).sum(axis=2)
+        I_perm[lo:hi] = (perm * lag_perm)[:, has_nbr].sum(axis=1) / (perm * perm)[:, has_nbr].sum(axis=1)
+    extreme = (I_perm >= I_obs).sum() if I_obs >= I_perm.mean() else (I_perm <= I_obs).sum()
+    out_global = {"I": I_obs, "EI": -1.0 / (n - 1), "p_sim": (extreme + 1) / (permutations + 1), "n": n}
+
+    # Lokal: I_i = z_i / m2 · (Wz)_i; undian bersama (c, k) dari n - 1 wilayah
+    I_loc = z / m2 * lag
+    larger = np.zeros(n, dtype=np.int64)
+    for lo in range(0, permutations, PERMUTATION_CHUNK):
+        hi = min(lo + PERMUTATION_CHUNK, permutations)
+        draws = np.argpartition(rng.random((hi - lo, n - 1)), k - 1, axis=1)[:, :k]
+        rand_nbr = draws[:, None, :] + (draws[:, None, :] >= np.arange(n)[None, :, None])   # (c, n, k)
+        lag_rand = (z[rand_nbr] * weights[None]).sum(axis=2)
+        larger += (z[None] / m2 * lag_rand >= I_loc[None]).sum(axis=0)
+    larger = np.minimum(larger, permutations - larger)
+    p_loc = (larger + 1) / (permutations + 1)
+
+    quadrant = np.select([(z > 0) & (lag > 0), (z < 0) & (lag > 0), (z < 0) & (lag < 0), (z > 0) & (lag < 0)],
+                         [1, 2, 3, 4], 0).astype(np.int8)
+    out_local["I"][ids[has_nbr]] = I_loc[has_nbr]
+    out_local["p"][ids[has_nbr]] = p_loc[has_nbr]
+    out_local["quadrant"][ids[has_nbr]] = quadrant[has_nbr]
+    return out_global, out_local
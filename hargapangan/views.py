@@ -0,0 +1,858 @@
+"""
+Tampilan tab dashboard yang dipakai bersama oleh semua tema.
+
+Setiap halaman tema (utama, street food, market insight, sederhana) hanya
+menyediakan CSS, header, dan `Theme` (teks serta palet grafik). Kueri data
+dan isi ketiga tab berasal dari modul ini dan dari satu mesin data bersama
+(`get_engine`).
+
+Isi tiap tab adalah `st.fragment`: widget di satu tab hanya menjalankan ulang
+tab itu, sehingga kueri dan grafik tab lain tidak dihitung dan dikirim ulang.
+"""
+
+from dataclasses import dataclass, field
+
+import pandas as pd
+import streamlit as st
+
+from hargapangan.engine import MORAN_K, MORAN_PERMUTATIONS, get_demo_engine, get_engine
+from hargapangan.figures import (
+    ChartStyle,
+    corr_figure,
+    disparity_figure,
+    lead_lag_figure,
+    lisa_map_figure,
+    map_figure,
+    rank_figure,
+    rolling_corr_figure,
+    trend_figure,
+)
+from hargapangan.leaderboard import METRICS, RANK_SUFFIX
+from hargapangan.regions import BASE_LEVEL, LEVELS, has_coordinates
+from hargapangan.schema import BASKET_COL, basket_presets
+
+DEFAULT_LABELS = {
+    "periode_tren": "Pilih periode analisis",
+    "kelompok": "Pilih kelompok komoditas",
+    "komoditas_tren": "Pilih komoditas yang ditampilkan",
+    "judul_tren": "Tren Komoditas Terpilih",
+    "judul_ringkasan": "Ringkasan Pergerakan Harga",
+    "catatan_ringkasan": (
+        "Ringkasan ini merangkum dinamika harga rata-rata nasional pada komoditas dan periode yang dipilih."
+    ),
+    "judul_perubahan_terakhir": "💡 Ringkasan Perubahan Harga (Bulan Terakhir)",
+    "periode_wilayah": "Pilih periode analisis",
+    "komoditas_wilayah": "Pilih komoditas untuk dibandingkan antar {tingkat}",
+    "tingkat_wilayah": "Tingkat wilayah",
+    "induk_wilayah": "Batasi ke",
+    "judul_peta": "Peta Sebaran Harga per {tingkat}",
+    "tampilan_peta": "Tampilan peta",
+    "ukuran_sel": "Ukuran sel grid",
+    "catatan_lisa": (
+        "Moran's I global = {i:.2f} (p = {p:.3f}, {perm} permutasi, bobot {k} tetangga terdekat). "
+        "I mendekati 1 berarti kabupaten/kota berharga mirip cenderung berdekatan. "
+        "Tinggi-Tinggi = kantong harga mahal, Rendah-Rendah = kantong harga murah, "
+        "Tinggi-Rendah/Rendah-Tinggi = wilayah yang berbeda dari sekitarnya (p < 0,05)."
+    ),
+    "judul_peringkat": "{tingkat} Dengan Komoditas Termahal dan Termurah",
+    "jumlah_wilayah": "Pilih jumlah {tingkat} termahal & termurah yang ditampilkan",
+    "catatan_peringkat": (
+        "Bar chart diatas merangkum {tingkat} dengan harga rata-rata tertinggi dan terendah "
+        "untuk komoditas {kom} pada periode analisis yang dipilih."
+    ),
+    "periode_korelasi": "Pilih periode analisis",
+    "judul_tabel_wilayah": "Tabel Lengkap Seluruh Kabupaten/Kota",
+    "komoditas_tabel": "Komoditas yang ditampilkan di tabel",
+    "urut_tabel": "Urutkan berdasarkan",
+    "cari_wilayah": "Cari kabupaten/kota",
+    "catatan_tabel_wilayah": (
+        "Menampilkan baris {dari}–{sampai} dari {total} kabupaten/kota. MoM = perubahan harga bulan "
+        "terakhir periode terhadap bulan sebelumnya; # = peringkat rata-rata (1 = termahal)."
+    ),
+    "judul_tetangga": "Harga {kom} di Sekitar Kabupaten/Kota",
+    "wilayah_acuan": "Kabupaten/kota acuan",
+    "jumlah_tetangga": "Jumlah tetangga terdekat",
+    "radius_tetangga": "Radius (km)",
+    "rata_tetangga": "Rata-rata {k} tetangga terdekat",
+    "dalam_radius": "Rata-rata {n} kab/kota dalam {km} km",
+    "catatan_tetangga": (
+        "Jarak dihitung sebagai jarak lingkaran besar antar titik koordinat kabupaten/kota. "
+        "Selisih = harga tetangga dikurangi harga wilayah acuan pada periode analisis yang dipilih."
+    ),
+    "judul_disparitas": "Ketimpangan Harga Antar {tingkat}",
+    "indeks_disparitas": "Indeks ketimpangan",
+    "komoditas_disparitas": "Komoditas yang dibandingkan",
+    "catatan_disparitas": (
+        "Setiap titik dihitung dari harga seluruh wilayah tingkat {tingkat} pada bulan tersebut. "
+        "Koefisien variasi = simpangan baku / rata-rata; Gini 0 berarti harga seragam dan makin "
+        "besar makin timpang; rasio tertinggi/terendah peka terhadap satu wilayah ekstrem, sedangkan "
+        "P90/P10 membandingkan batas 10% termahal dengan batas 10% termurah."
+    ),
+    "judul_keranjang": "Biaya Keranjang Pangan per {tingkat}",
+    "preset_keranjang": "Preset keranjang",
+    "catatan_keranjang": (
+        "Biaya keranjang = Σ kuantitas × harga tiap komoditas, per wilayah dan bulan (kuantitas dalam "
+        "satuan harga, mis. kg atau liter). Harga komoditas yang tidak dilaporkan suatu wilayah diisi "
+        "rata-rata nasional bulan itu; wilayah tanpa laporan satu pun komoditas keranjang diabaikan."
+    ),
+    "judul_pilih_korelasi": None,
+    "judul_korelasi": "Korelasi Antar Komoditas",
+    "metode_korelasi": "Metode korelasi",
+    "judul_korelasi_bergulir": "Korelasi Bergulir Dua Komoditas",
+    "komoditas_bergulir_a": "Komoditas pertama",
+    "komoditas_bergulir_b": "Komoditas kedua",
+    "jendela_bergulir": "Panjang jendela (bulan)",
+    "catatan_bergulir": (
+        "Setiap titik adalah korelasi Pearson antar seluruh kabupaten/kota pada {window} bulan "
+        "yang berakhir di bulan tersebut; garis putus-putus menunjukkan korelasi seluruh periode."
+    ),
+    "judul_lead_lag": "Siapa Bergerak Lebih Dulu? (Korelasi Silang Antar Lag)",
+    "komoditas_acuan": "Komoditas acuan",
+    "sumber_lead_lag": "Deret yang dibandingkan",
+    "catatan_lead_lag": (
+        "Sel pada lag +k adalah korelasi harga {kom} bulan t dengan komoditas lain bulan t + k: "
+        "puncak di lag positif berarti {kom} bergerak lebih dulu, di lag negatif berarti tertinggal. "
+        "Kotak menandai lag dengan korelasi (mutlak) terkuat tiap baris di dalam ±{jendela} bulan; "
+        "lag yang lebih jauh bertumpu pada terlalu sedikit bulan yang tumpang tindih. "
+        "Mode per kabupaten/kota adalah korelasi dalam-wilayah: harga tiap wilayah dikurangi "
+        "rata-ratanya sendiri, jadi yang dibandingkan adalah gerak harga, bukan selisih tingkat harga."
+    ),
+    "judul_lag_dominan": "Lag dominan tiap pasangan komoditas terpilih",
+}
+
+# Mode peta Tab 2: sel grid (agregat server-side), satu titik per Kab/Kota,
+# atau klaster autokorelasi spasial
+MAP_MODES = {
+    "hex": "Grid heksagon",
+    "square": "Grid persegi",
+    "points": "Titik Kab/Kota",
+    "lisa": "Klaster LISA",
+}
+MAP_CELL_SIZES = [0.25, 0.5, 1.0, 2.0]
+
+# Tingkat wilayah Tab 2 (lihat `hargapangan.regions.LEVELS`)
+LEVEL_LABELS = {
+    "kabkota": "Kabupaten/Kota",
+    "provinsi": "Provinsi",
+    "pulau": "Kelompok Pulau",
+}
+
+# Indeks ketimpangan antar wilayah (lihat `hargapangan.cube.disparity_indices`)
+DISPARITY_LABELS = {
+    "cv": "Koefisien variasi",
+    "gini": "Gini",
+    "max_min": "Tertinggi / terendah",
+    "p90_p10": "P90 / P10",
+}
+
+# Pilihan jumlah baris per halaman tabel lengkap Kab/Kota
+LEADERBOARD_PAGE_SIZES = [25, 50, 100]
+
+# Rentang lag korelasi silang (bulan, dua arah)
+LEAD_LAG_MAX = 6
+
+# Pasangan awal tampilan korelasi bergulir (jika ada di data)
+ROLLING_DEFAULT_PAIR = ("Cabai Merah Keriting", "Cabai Rawit Merah")
+
+CORR_METHOD_LABELS = {
+    "pearson": "Pearson",
+    "spearman": "Spearman (peringkat)",
+    "kendall": "Kendall (tau-b)",
+}
+
+
+@dataclass(frozen=True)
+class Theme:
+    """
+    Lapisan presentasi satu varian dashboard.
+
+    - `heading`: gaya judul bagian; "html" (div .section-title), "card"
+      (dibungkus .section-card dengan ikon), atau "plain" (st.subheader)
+    - `sections`: kunci tab -> (ikon, judul, keterangan)
+    - `insights`: kunci tab -> (judul expander, isi markdown)
+    - `labels`: pengganti sebagian `DEFAULT_LABELS`
+    - `chart`: gaya grafik (lihat `hargapangan.figures.ChartStyle`)
+    """
+
+    heading: str = "html"
+    subheading: str = "####"
+    tab_labels: tuple = ("📈 Tren Nasional", "🗺️ Perbandingan Wilayah", "🔗 Korelasi Komoditas")
+    sections: dict = field(default_factory=dict)
+    insights: dict = field(default_factory=dict)
+    labels: dict = field(default_factory=dict)
+    chart: ChartStyle = ChartStyle()
+    top_n_default: int = 10
+    show_latest_change: bool = False
+
+    def label(self, key, **kwargs):
+        text = self.labels.get(key, DEFAULT_LABELS[key])
+        return text.format(**kwargs) if text and kwargs else text
+
+
+# ==============================
+# PRIMITIF PRESENTASI
+# ==============================
+def load_engine():
+    """Mesin data bersama; jatuh ke data simulasi (mode demo) jika CSV tidak ada."""
+    try:
+        return get_engine()
+    except FileNotFoundError:
+        st.info("⚠️ **Mode Demo Aktif:** File data asli tidak ditemukan. Dashboard ini berjalan menggunakan **Data Simulasi**.")
+        return get_demo_engine()
+
+
+def _section_open(theme, key):
+    icon, title, caption = theme.sections[key]
+    if theme.heading == "plain":
+        st.subheader(title)
+        return
+    if theme.heading == "card":
+        st.markdown('<div class="section-card">', unsafe_allow_html=True)
+        title = f'<span class="icon">{icon}</span>{title}'
+    elif icon:
+        title = f"{icon} {title}"
+    st.markdown(f'<div class="section-title">{title}</div>', unsafe_allow_html=True)
+    if caption:
+        st.markdown(f'<div class="section-caption">{caption}</div>', unsafe_allow_html=True)
+
+
+def _section_close(theme):
+    if theme.heading == "card":
+        st.markdown("</div>", unsafe_allow_html=True)
+
+
+def _subheading(theme, text):
+    if text:
+        st.markdown(f"{theme.subheading} {text}")
+
+
+def _note(theme, text):
+    if theme.heading == "plain":
+        st.caption(text)
+    else:
+        st.markdown(f'<div class="caption-muted">{text}</div>', unsafe_allow_html=True)
+
+
+def _insight(theme, key):
+    if key in theme.insights:
+        title, body = theme.insights[key]
+        with st.expander(title):
+            st.markdown(body)
+
+
+def _rupiah_text(value):
+    return "–" if pd.isna(value) else f"Rp {value:,.0f}"
+
+
+def _month_slider(label, cube, key=None):
+    # Slider bulanan: nilai selalu jatuh di awal bulan sehingga langsung
+    # dipetakan ke indeks bulan di kubus dan kunci cache tetap stabil
+    bulan_opsi = list(cube.periods.date)
+    start_date, end_date = st.select_slider(
+        label,
+        options=bulan_opsi,
+        value=(bulan_opsi[0], bulan_opsi[-1]),
+        format_func=lambda d: d.strftime("%b %Y"),
+        key=key
+    )
+    return cube.time_slice(start_date, end_date)
+
+
+def _level_picker(theme, engine):
+    # Tingkat wilayah + drill-down ke satu induk (tingkat tepat di atasnya):
+    # Pulau -> Provinsi -> Kab/Kota. Tanpa hierarki selalu Kab/Kota nasional.
+    levels = engine.levels
+    if len(levels) == 1:
+        return BASE_LEVEL, None
+
+    col_level, col_parent = st.columns([2, 1])
+    with col_level:
+        level = st.radio(
+            theme.label("tingkat_wilayah"),
+            options=levels,
+            format_func=LEVEL_LABELS.get,
+            horizontal=True,
+            key="tingkat_wilayah"
+        )
+    parent_levels = levels[levels.index(level) + 1:]
+    if not parent_levels:
+        return level, None
+
+    parent_col = LEVELS[parent_levels[0]]
+    with col_parent:
+        parent = st.selectbox(
+            theme.label("induk_wilayah"),
+            options=[None, *engine.level_dim(parent_levels[0])[parent_col].astype(str)],
+            format_func=lambda name: "Seluruh Indonesia" if name is None else name,
+            key=f"induk_{level}"
+        )
+    return level, None if parent is None else (parent_col, parent)
+
+
+# ==============================
+# DASHBOARD
+# ==============================
+def render_tabs(theme, engine):
+    tab1, tab2, tab3 = st.tabs(list(theme.tab_labels))
+    with tab1:
+        render_tren(theme, engine)
+    with tab2:
+        render_wilayah(theme, engine)
+    with tab3:
+        render_korelasi(theme, engine)
+
+
+# TAB 1 – TREN NASIONAL
+@st.fragment
+def render_tren(theme, engine):
+    komoditas_cols = list(engine.komoditas_cols)
+    groups = engine.groups
+
+    _section_open(theme, "tren")
+
+    # Irisan kontigu sumbu bulan (searchsorted pada indeks bulan)
+    t_tren = _month_slider(theme.label("periode_tren"), engine.clean)
+
+    # Kolom untuk pengaturan komoditas
+    col_f1, col_f2 = st.columns([1, 2])
+
+    with col_f1:
+        group_choice = st.selectbox(
+            theme.label("kelompok"),
+            options=list(groups.keys()),
+            key="group_tren"
+        )
+
+    with col_f2:
+        candidate_koms = groups[group_choice] if groups[group_choice] else komoditas_cols
+        default_koms = candidate_koms[:5] if len(candidate_koms) >= 5 else candidate_koms
+        selected_koms = st.multiselect(
+            theme.label("komoditas_tren"),
+            options=candidate_koms,
+            default=default_koms,
+            key="komoditas_tren"
+        )
+
+    if t_tren.start == t_tren.stop:
+        st.warning("Tidak ada data untuk periode yang dipilih.")
+    else:
+        # Rata-rata nasional per periode (reduksi sumbu wilayah di kubus)
+        avg_trend = engine.national_mean("clean", t_tren, komoditas_cols).reset_index()
+
+        # Grafik tren per komoditas
+        _subheading(theme, theme.label("judul_tren"))
+
+        if not selected_koms:
+            st.info("Pilih minimal satu komoditas untuk melihat grafik tren.")
+        else:
+            st.plotly_chart(trend_figure(engine, t_tren, selected_koms, theme.chart), use_container_width=True)
+
+        # Harga rata-rata nasional (agregat)
+        if selected_koms:
+            monthly_avg_all = avg_trend[selected_koms].mean(axis=1)
+        else:
+            monthly_avg_all = avg_trend[komoditas_cols].mean(axis=1)
+
+        if len(monthly_avg_all) > 1:
+            start_price = float(monthly_avg_all.iloc[0])
+            end_price = float(monthly_avg_all.iloc[-1])
+            growth_nominal = end_price - start_price
+            growth_percent = (growth_nominal / start_price * 100) if start_price != 0 else 0.0
+
+            _subheading(theme, theme.label("judul_ringkasan"))
+            m1, m2, m3 = st.columns(3)
+            m1.metric("Harga awal", f"Rp {start_price:,.0f}")
+            m2.metric("Harga akhir", f"Rp {end_price:,.0f}", f"{growth_nominal:,.0f}")
+            m3.metric(
+                "Pertumbuhan rata-rata",
+                f"{growth_percent:.2f}%" + ("" if selected_koms else " (semua komoditas)")
+            )
+            _note(theme, theme.label("catatan_ringkasan"))
+
+        # Perubahan bulan terakhir per komoditas terpilih
+        if theme.show_latest_change and selected_koms and len(avg_trend) > 0:
+            _subheading(theme, theme.label("judul_perubahan_terakhir"))
+            cols_m = st.columns(len(selected_koms))
+            for i, kom in enumerate(selected_koms):
+                curr_price = avg_trend[kom].iloc[-1]
+                prev_price = avg_trend[kom].iloc[-2] if len(avg_trend) > 1 else curr_price
+                delta = curr_price - prev_price
+                cols_m[i].metric(label=kom, value=f"Rp {curr_price:,.0f}", delta=f"{delta:,.0f} (vs bln lalu)")
+
+        _insight(theme, "tren")
+
+    _section_close(theme)
+
+
+# TAB 2 – PERBANDINGAN WILAYAH
+@st.fragment
+def render_wilayah(theme, engine):
+    komoditas_cols = list(engine.komoditas_cols)
+    regions = engine.regions
+    wins_cube = engine.wins
+
+    _section_open(theme, "wilayah")
+
+    if not wins_cube.mask.any():
+        st.warning("Dataset kosong.")
+        _section_close(theme)
+        return
+
+    t_reg = _month_slider(theme.label("periode_wilayah"), wins_cube, key="periode_wilayah")
+
+    if t_reg.start == t_reg.stop:
+        st.warning("Tidak ada data untuk rentang waktu yang dipilih.")
+        _section_close(theme)
+        return
+
+    # Tingkat dipilih lebih dulu agar label komoditas & peringkat mengikutinya
+    level, within = _level_picker(theme, engine)
+    tingkat = LEVEL_LABELS[level]
+
+    kom_for_region = st.selectbox(
+        theme.label("komoditas_wilayah", tingkat=tingkat.lower()),
+        options=komoditas_cols,
+        key="komoditas_wilayah"
+    )
+
+    # Rata-rata per wilayah (cache LRU di mesin data, dipakai juga oleh figur)
+    region_avg = engine.region_mean("wins", t_reg, kom_for_region, level)
+    if within is not None:
+        region_avg = region_avg[(engine.level_dim(level)[within[0]] == within[1]).to_numpy()]
+
+    # PETA SEBARAN HARGA
+    _subheading(theme, theme.label("judul_peta", tingkat=tingkat))
+
+    if not has_coordinates(regions):
+        st.info("File data geospasial (data_harga_pangan_with_latlon_FINAL.csv) tidak ditemukan. Peta tidak dapat ditampilkan.")
+    else:
+        # Grid & LISA dihitung atas seluruh Kab/Kota; tingkat lain dan
+        # tampilan per induk cukup satu titik per wilayah
+        map_mode = "points"
+        col_mode, col_size = st.columns([2, 1])
+        if level == BASE_LEVEL and within is None:
+            with col_mode:
+                map_mode = st.radio(
+                    theme.label("tampilan_peta"),
+                    options=list(MAP_MODES),
+                    format_func=MAP_MODES.get,
+                    horizontal=True,
+                    key="map_mode"
+                )
+        grid = None
+        if map_mode in ("hex", "square"):
+            with col_size:
+                cell_size = st.select_slider(
+                    theme.label("ukuran_sel"),
+                    options=MAP_CELL_SIZES,
+                    value=MAP_CELL_SIZES[1],
+                    format_func=lambda d: f"{d:g}°",
+                    key="map_cell_size"
+                )
+            grid = (map_mode, cell_size)
+
+        if map_mode == "lisa":
+            moran_i, _ = engine.spatial_autocorr("wins", t_reg, kom_for_region)
+            fig_map = lisa_map_figure(engine, t_reg, kom_for_region, theme.chart)
+        else:
+            fig_map = map_figure(engine, t_reg, kom_for_region, theme.chart, grid, level, within)
+        if fig_map is None:
+            st.info("Tidak ada data lokasi yang valid untuk periode & komoditas ini.")
+        else:
+            st.plotly_chart(fig_map, use_container_width=True)
+            if map_mode == "lisa":
+                _note(theme, theme.label(
+                    "catatan_lisa",
+                    i=moran_i["I"], p=moran_i["p_sim"], k=MORAN_K, perm=MORAN_PERMUTATIONS
+                ))
+
+    # RATA-RATA PER WILAYAH
+    _subheading(theme, theme.label("judul_peringkat", tingkat=tingkat))
+    n_valid = int(region_avg.notna().sum())
+
+    if n_valid == 0:
+        st.info(f"Tidak ada data setelah agregasi per {tingkat.lower()}.")
+        _section_close(theme)
+        return
+
+    max_region = min(25, n_valid)
+    if max_region > 1:
+        n_region = st.slider(
+            theme.label("jumlah_wilayah", tingkat=tingkat.lower()),
+            min_value=min(3, max_region - 1),
+            max_value=max_region,
+            value=min(theme.top_n_default, max_region)
+        )
+    else:
+        n_region = max_region
+
+    c1, c2 = st.columns(2)
+
+    # Wilayah termahal
+    with c1:
+        fig_top = rank_figure(engine, t_reg, kom_for_region, n_region, True, theme.chart, level, within)
+        st.plotly_chart(fig_top, use_container_width=True)
+
+    # Wilayah termurah
+    with c2:
+        fig_bottom = rank_figure(engine, t_reg, kom_for_region, n_region, False, theme.chart, level, within)
+        st.plotly_chart(fig_bottom, use_container_width=True)
+
+    _note(theme, theme.label("catatan_peringkat", kom=kom_for_region, tingkat=tingkat.lower()))
+
+    render_leaderboard(theme, engine, t_reg, kom_for_region)
+    if has_coordinates(regions):
+        render_tetangga(theme, engine, t_reg, kom_for_region)
+    render_disparitas(theme, engine, t_reg, kom_for_region, level)
+    render_keranjang(theme, engine, t_reg, level, within, n_region)
+
+    _insight(theme, "wilayah")
+    _section_close(theme)
+
+
+# Tabel lengkap berjalan sebagai fragment sendiri: urut/halaman baru tidak
+# mengirim ulang peta & bar chart
+@st.fragment
+def render_leaderboard(theme, engine, time_range, default_kom):
+    board = engine.leaderboard("wins", time_range)
+    komoditas_cols = list(engine.komoditas_cols)
+
+    _subheading(theme, theme.label("judul_tabel_wilayah"))
+
+    col_kom, col_sort, col_dir = st.columns([3, 2, 1])
+    with col_kom:
+        koms = st.multiselect(
+            theme.label("komoditas_tabel"),
+            options=komoditas_cols,
+            default=[default_kom]
+        )
+    sort_options = [(None, None)] + [(metric, kom) for kom in koms for metric in METRICS]
+    with col_sort:
+        metric, kom_sort = st.selectbox(
+            theme.label("urut_tabel"),
+            options=sort_options,
+            index=1 if koms else 0,
+            format_func=lambda opt: (
+                "Kab/Kota" if opt[0] is None
+                else f"{opt[1]} – {'rata-rata' if opt[0] == 'mean' else 'perubahan MoM'}"
+            )
+        )
+    with col_dir:
+        descending = st.radio(
+            "Urutan", options=[True, False],
+            format_func=lambda d: "Menurun" if d else "Menaik",
+            index=0 if metric is not None else 1
+        )
+
+    col_q, col_size, col_page = st.columns([3, 1, 1])
+    with col_q:
+        query = st.text_input(theme.label("cari_wilayah"), key="leaderboard_query")
+    order = board.order(metric, kom_sort, descending, query)
+    with col_size:
+        page_size = st.selectbox("Baris per halaman", options=LEADERBOARD_PAGE_SIZES, key="leaderboard_size")
+    n_pages = max(1, -(-len(order) // page_size))
+    # Jumlah halaman menyusut saat pencarian/ukuran halaman berubah
+    if st.session_state.get("leaderboard_page", 1) > n_pages:
+        st.session_state["leaderboard_page"] = n_pages
+    with col_page:
+        page = st.number_input(f"Halaman (dari {n_pages})", min_value=1, max_value=n_pages, key="leaderboard_page")
+
+    table = board.page(order, page - 1, page_size, koms)
+    column_config = {"No": st.column_config.NumberColumn(width="small")}
+    for kom in koms:
+        column_config[kom] = st.column_config.NumberColumn(format="Rp %d")
+        column_config[kom + METRICS["mom"]] = st.column_config.NumberColumn(format="%.1f%%")
+        column_config[kom + RANK_SUFFIX] = st.column_config.NumberColumn(help="Peringkat rata-rata (1 = termahal)")
+    st.dataframe(table, hide_index=True, use_container_width=True, column_config=column_config)
+
+    shown_from = (page - 1) * page_size + 1 if len(table) else 0
+    _note(theme, theme.label(
+        "catatan_tabel_wilayah",
+        dari=shown_from, sampai=shown_from + len(table) - 1 if len(table) else 0, total=len(order)
+    ))
+
+
+# Kueri ketetanggaan memakai matriks tetangga bersama (lihat DataEngine.nearest_regions)
+@st.fragment
+def render_tetangga(theme, engine, time_range, commodity):
+    names = engine.regions["Kab/Kota"]
+
+    _subheading(theme, theme.label("judul_tetangga", kom=commodity))
+
+    col_r, col_k, col_km = st.columns([2, 1, 1])
+    with col_r:
+        region_id = st.selectbox(
+            theme.label("wilayah_acuan"),
+            options=list(names.index),
+            format_func=names.get,
+            key="neighbor_region"
+        )
+    with col_k:
+        k = st.slider(theme.label("jumlah_tetangga"), min_value=3, max_value=15, value=5, key="neighbor_k")
+    with col_km:
+        radius = st.slider(theme.label("radius_tetangga"), min_value=25, max_value=300, value=100, step=25,
+                           key="neighbor_radius")
+
+    price = engine.region_mean("wins", time_range, commodity).get(region_id)
+    lag = engine.spatial_lag("wins", time_range, k).at[region_id, commodity]
+    within = engine.regions_within(region_id, radius)
+    within_mean = engine.region_mean("wins", time_range, commodity).reindex(within.index).mean()
+
+    c1, c2, c3 = st.columns(3)
+    c1.metric(names[region_id], _rupiah_text(price))
+    c2.metric(
+        theme.label("rata_tetangga", k=k),
+        _rupiah_text(lag),
+        delta=None if pd.isna(lag) or pd.isna(price) else f"{lag - price:,.0f} vs wilayah acuan",
+        delta_color="off"
+    )
+    c3.metric(theme.label("dalam_radius", km=radius, n=len(within)), _rupiah_text(within_mean))
+
+    nearest = engine.nearest_regions("wins", time_range, commodity, region_id, k)
+    st.dataframe(
+        nearest,
+        hide_index=True,
+        use_container_width=True,
+        column_config={
+            "Jarak (km)": st.column_config.NumberColumn(format="%.0f"),
+            commodity: st.column_config.NumberColumn(format="Rp %.0f"),
+            "Selisih (Rp)": st.column_config.NumberColumn(format="%.0f"),
+            "Selisih (%)": st.column_config.NumberColumn(format="%.1f%%"),
+        }
+    )
+    _note(theme, theme.label("catatan_tetangga"))
+
+
+# Indeks ketimpangan seluruh bulan & komoditas di-cache per (jenis, tingkat);
+# ganti indeks/komoditas hanya mengiris dan menggambar ulang grafik ini
+@st.fragment
+def render_disparitas(theme, engine, time_range, default_kom, level):
+    tingkat = LEVEL_LABELS[level]
+    _subheading(theme, theme.label("judul_disparitas", tingkat=tingkat))
+
+    col_idx, col_kom = st.columns([1, 2])
+    with col_idx:
+        index = st.selectbox(
+            theme.label("indeks_disparitas"),
+            options=list(DISPARITY_LABELS),
+            format_func=DISPARITY_LABELS.get,
+            key="indeks_disparitas"
+        )
+    with col_kom:
+        koms = st.multiselect(
+            theme.label("komoditas_disparitas"),
+            options=list(engine.komoditas_cols),
+            default=[default_kom],
+            key="komoditas_disparitas"
+        )
+    if not koms:
+        st.info("Pilih minimal satu komoditas.")
+        return
+
+    fig = disparity_figure(engine, time_range, koms, index, theme.chart, level)
+    st.plotly_chart(fig, use_container_width=True)
+    _note(theme, theme.label("catatan_disparitas", tingkat=tingkat.lower()))
+
+
+# Keranjang = mesin turunan berkomoditas tunggal (DataEngine.basket): peta,
+# peringkat, dan tren memakai figur yang sama dengan komoditas biasa
+@st.fragment
+def render_keranjang(theme, engine, time_range, level, within, n_region):
+    komoditas_cols = list(engine.komoditas_cols)
+    presets = basket_presets(engine.groups)
+    _subheading(theme, theme.label("judul_keranjang", tingkat=LEVEL_LABELS[level]))
+
+    col_qty, col_trend = st.columns([1, 2])
+    with col_qty:
+        preset = st.selectbox(theme.label("preset_keranjang"), options=list(presets), key="preset_keranjang")
+        # Satu editor per preset: ganti preset memulai dari kuantitas preset itu
+        edited = st.data_editor(
+            pd.DataFrame({
+                "Komoditas": komoditas_cols,
+                "Kuantitas": [presets[preset].get(kom, 0.0) for kom in komoditas_cols],
+            }),
+            column_config={
+                "Komoditas": st.column_config.TextColumn(disabled=True),
+                "Kuantitas": st.column_config.NumberColumn(min_value=0.0, step=0.5, format="%.1f"),
+            },
+            hide_index=True,
+            use_container_width=True,
+            key=f"kuantitas_{preset}"
+        )
+    quantities = dict(zip(edited["Komoditas"], edited["Kuantitas"].fillna(0.0)))
+    basket = engine.basket(quantities)
+    if not basket.wins.mask.any():
+        with col_trend:
+            st.info("Isi kuantitas minimal satu komoditas.")
+        return
+
+    with col_trend:
+        st.plotly_chart(trend_figure(basket, time_range, [BASKET_COL], theme.chart), use_container_width=True)
+
+    if has_coordinates(engine.regions):
+        fig_map = map_figure(basket, time_range, BASKET_COL, theme.chart, None, level, within)
+        if fig_map is not None:
+            st.plotly_chart(fig_map, use_container_width=True)
+
+    c1, c2 = st.columns(2)
+    with c1:
+        fig_top = rank_figure(basket, time_range, BASKET_COL, n_region, True, theme.chart, level, within)
+        st.plotly_chart(fig_top, use_container_width=True)
+    with c2:
+        fig_bottom = rank_figure(basket, time_range, BASKET_COL, n_region, False, theme.chart, level, within)
+        st.plotly_chart(fig_bottom, use_container_width=True)
+    _note(theme, theme.label("catatan_keranjang"))
+
+
+# TAB 3 – KORELASI KOMODITAS
+@st.fragment
+def render_korelasi(theme, engine):
+    komoditas_cols = list(engine.komoditas_cols)
+
+    _section_open(theme, "korelasi")
+
+    if not engine.wins.mask.any():
+        st.warning("Dataset kosong.")
+        _section_close(theme)
+        return
+
+    # Rentang bulan apa pun dirakit dari statistik cukup kumulatif di kubus
+    t_corr = _month_slider(theme.label("periode_korelasi"), engine.wins, key="periode_korelasi")
+
+    if t_corr.start == t_corr.stop:
+        st.warning("Tidak ada data untuk rentang waktu yang dipilih.")
+        _section_close(theme)
+        return
+
+    _subheading(theme, theme.label("judul_pilih_korelasi"))
+
+    # Checkbox "Pilih semua"
+    pilih_semua = st.checkbox("Pilih semua komoditas", value=True)
+
+    selected_corr = []
+
+    if pilih_semua:
+        selected_corr = komoditas_cols.copy()
+    else:
+        # Tampilkan checkbox per komoditas dalam beberapa kolom agar rapi
+        n_cols = 3
+        cols = st.columns(n_cols)
+
+        for i, kom in enumerate(komoditas_cols):
+            col = cols[i % n_cols]
+            cek = col.checkbox(kom, value=False, key=f"corr_{kom}")
+            if cek:
+                selected_corr.append(kom)
+
+    # Metode yang tersedia = matriks yang sudah dihitung di kubus
+    method = st.radio(
+        theme.label("metode_korelasi"),
+        engine.wins.corr_methods,
+        format_func=lambda m: CORR_METHOD_LABELS.get(m, m),
+        horizontal=True,
+        key="corr_method",
+    )
+
+    if len(selected_corr) < 2:
+        st.info("Centang minimal dua komoditas untuk melihat matriks korelasi.")
+    else:
+        fig_corr = corr_figure(engine, t_corr, selected_corr, theme.chart, method)
+
+        _subheading(theme, theme.label("judul_korelasi"))
+
+        st.plotly_chart(fig_corr, use_container_width=True)
+
+        _insight(theme, "korelasi")
+
+    render_korelasi_bergulir(theme, engine)
+    render_lead_lag(theme, engine, selected_corr)
+
+    _section_close(theme)
+
+
+def render_korelasi_bergulir(theme, engine):
+    komoditas_cols = list(engine.komoditas_cols)
+    n_periods = engine.wins.shape[1]
+    if len(komoditas_cols) < 2 or n_periods < 3:
+        return
+
+    _subheading(theme, theme.label("judul_korelasi_bergulir"))
+
+    default_a, default_b = (
+        ROLLING_DEFAULT_PAIR if set(ROLLING_DEFAULT_PAIR) <= set(komoditas_cols) else komoditas_cols[:2]
+    )
+    col_a, col_b, col_w = st.columns([2, 2, 1])
+    with col_a:
+        kom_a = st.selectbox(
+            theme.label("komoditas_bergulir_a"),
+            options=komoditas_cols,
+            index=komoditas_cols.index(default_a),
+            key="rolling_a"
+        )
+    with col_b:
+        pilihan_b = [k for k in komoditas_cols if k != kom_a]
+        kom_b = st.selectbox(
+            theme.label("komoditas_bergulir_b"),
+            options=pilihan_b,
+            index=pilihan_b.index(default_b) if default_b in pilihan_b else 0,
+            key="rolling_b"
+        )
+    with col_w:
+        window = st.slider(
+            theme.label("jendela_bergulir"),
+            min_value=2,
+            max_value=min(12, n_periods - 1),
+            value=min(6, n_periods - 1),
+            key="rolling_window"
+        )
+
+    fig_rolling = rolling_corr_figure(engine, window, kom_a, kom_b, theme.chart)
+    st.plotly_chart(fig_rolling, use_container_width=True)
+    _note(theme, theme.label("catatan_bergulir", window=window))
+
+
+def render_lead_lag(theme, engine, commodities):
+    komoditas_cols = list(engine.komoditas_cols)
+    if len(komoditas_cols) < 2 or engine.wins.shape[1] < 3:
+        return
+
+    _subheading(theme, theme.label("judul_lead_lag"))
+
+    col_ref, col_src = st.columns([2, 2])
+    with col_ref:
+        acuan = st.selectbox(
+            theme.label("komoditas_acuan"),
+            options=komoditas_cols,
+            index=komoditas_cols.index(ROLLING_DEFAULT_PAIR[0]) if ROLLING_DEFAULT_PAIR[0] in komoditas_cols else 0,
+            key="lead_lag_ref"
+        )
+    with col_src:
+        per_region = st.radio(
+            theme.label("sumber_lead_lag"),
+            options=[False, True],
+            format_func=lambda p: "Per kabupaten/kota" if p else "Rata-rata nasional",
+            horizontal=True,
+            key="lead_lag_per_region"
+        )
+
+    fig_lag = lead_lag_figure(engine, acuan, LEAD_LAG_MAX, per_region, theme.chart)
+    st.plotly_chart(fig_lag, use_container_width=True)
+    _note(theme, theme.label("catatan_lead_lag", kom=acuan, jendela=engine.lag_window("wins", LEAD_LAG_MAX)))
+
+    # Ringkasan lag dominan untuk komoditas yang dicentang di atas
+    if len(commodities) >= 2:
+        dominan = engine.dominant_lags("wins", commodities, LEAD_LAG_MAX, per_region)
+        dominan = dominan.reindex(dominan["Korelasi"].abs().sort_values(ascending=False).index)
+        with st.expander(theme.label("judul_lag_dominan")):
+            st.dataframe(
+                dominan,
+                hide_index=True,
+                use_container_width=True,
+                column_config={
+                    "Lag": st.column_config.NumberColumn(help="> 0: A mendahului B; < 0: B mendahului A"),
+                    "Korelasi": st.column_config.NumberColumn(format="%.2f"),
+                    "Di tepi": st.column_config.CheckboxColumn(
+                        help="Lag di batas jendela: puncak sebenarnya mungkin lebih jauh"
+                    ),
+                }
+            )